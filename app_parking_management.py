@@ -1,10 +1,15 @@
-import cv2
 import numpy as np
 import supervision as sv
 from ultralytics import YOLO
-from datetime import datetime
 import logging
-from pathlib import Path
+from typing import Callable, Optional, Tuple
+from src.config.settings import (AUTO_TUNE, FRAME_CACHE_ENABLED, FRAME_SKIP, INFERENCE_SIZE,
+                                 MODEL_PRECISION, ROI, TILED_INFERENCE, TRACKER_TYPE)
+from src.detectors.autotune import select_configuration
+from src.detectors.vehicle_detector import ProcessingCancelled, VehicleDetector, load_model
+from src.utils.frame_cache import FrameCache, scaled_size
+from src.utils.traffic_stats import TrafficStats, stats_path
+from src.utils.video_reader import DecodedFrame, FrameReader, create_frame_reader
 
 # Setup logging
 logging.basicConfig(
@@ -17,269 +22,103 @@ logging.basicConfig(
 )
 
 class VehicleTrackingSystem:
-    def __init__(self, source_path: str, target_path: str):
+    def __init__(self, source_path: str, target_path: str, imgsz: int = INFERENCE_SIZE,
+                 tiled: bool = TILED_INFERENCE, model: Optional[YOLO] = None,
+                 tracker: str = TRACKER_TYPE, precision: str = MODEL_PRECISION,
+                 auto_tune: bool = AUTO_TUNE, frame_skip: int = FRAME_SKIP,
+                 roi: Optional[Tuple[int, int, int, int]] = ROI):
         self.source_path = source_path
         self.target_path = target_path
+        self.imgsz = imgsz
         
         # Initialize video info
         self.video_info = sv.VideoInfo.from_video_path(source_path)
+        # Clips over the frame cache limit are decoded normally at their full size
+        self.use_cache = FRAME_CACHE_ENABLED and FrameCache().fits(source_path)
+        if self.use_cache:
+            # Cached frames may be stored downscaled, line and output follow the cached size
+            self.video_info.width, self.video_info.height = scaled_size(
+                self.video_info.width, self.video_info.height
+            )
         logging.info(f"Video Info: {self.video_info}")
         
-        # Initialize YOLO model
-        self.model = YOLO("yolov8x.pt")
-        
-        # Initialize ByteTracker
-        self.byte_tracker = sv.ByteTrack()
+        # Initialize YOLO model (long-lived workers pass in an already loaded one)
+        if model is None and auto_tune and precision == "fp32":
+            if tiled:
+                # Candidates are timed on full-frame inference, the result would not hold per tile
+                raise ValueError("AUTO_TUNE does not support TILED_INFERENCE, disable one of them")
+            # Benchmarked model size and input size for this host, cached after the first run
+            model_path, self.imgsz = select_configuration(source_path)
+            model = load_model(precision, model_path)
+        if model is None:
+            model = load_model(precision)
         
-        # Initialize line counter with proper position
-        self.line_start = sv.Point(0, int(self.video_info.height * 0.5))
-        self.line_end = sv.Point(self.video_info.width, int(self.video_info.height * 0.5))
-        self.line_zone = sv.LineZone(start=self.line_start, end=self.line_end)
+        # Per-minute and per-hour IN/OUT aggregates, saved next to the other data per video
+        self.stats = TrafficStats(self.video_info.fps)
+        self.stats_path = stats_path(source_path)
         
-        # Initialize trace annotator
-        self.trace_annotator = sv.TraceAnnotator(
-            thickness=2,
-            trace_length=30
+        # Detection, tracking, counting and annotation all run in the shared engine
+        self.detector = VehicleDetector(
+            self.video_info.width,
+            self.video_info.height,
+            model=model,
+            imgsz=self.imgsz,
+            tracker=tracker,
+            tiled=tiled,
+            frame_skip=frame_skip,
+            roi=roi,
+            annotate=True,
+            stats=self.stats
         )
+        self.model = self.detector.model
+        self.line_zone = self.detector.line_zone
+        self.line_start = self.detector.line_start
+        self.line_end = self.detector.line_end
         
-        # Vehicle classes (now we'll treat all vehicle classes as cars)
-        self.vehicle_classes = [2, 3, 5, 7]  # car, motorcycle, bus, truck
+    @property
+    def crossing_events(self):
+        return self.detector.crossing_events
         
-    def process_frame(self, frame: np.ndarray, frame_number: int) -> np.ndarray:
+    def process_frame(self, frame: np.ndarray, frame_number: int,
+                      decoded: Optional[DecodedFrame] = None) -> np.ndarray:
+        return self.detector.process_frame(frame, frame_number, decoded)
+    
+    def create_reader(self, backend: Optional[str] = None) -> FrameReader:
+        # Decode-stage tensors only when detection will use them, and only for detected frames
+        return create_frame_reader(
+            self.source_path, backend,
+            imgsz=self.imgsz if self.detector.uses_tensor else None,
+            use_cache=self.use_cache,
+            frame_skip=self.detector.frame_skip
+        )
+    
+    def save_stats(self):
         try:
-            # Run detection
-            results = self.model(frame, verbose=False)[0]
-            detections = sv.Detections.from_ultralytics(results)
-            
-            # Filter for all vehicle types but label them as cars
-            mask = np.array([
-                int(class_id) in self.vehicle_classes  # Include all vehicle types
-                for class_id in detections.class_id
-            ])
-            detections = detections[mask]
-            
-            # Update tracking
-            tracked_detections = self.byte_tracker.update_with_detections(detections)
-            
-            # Update line counter
-            self.line_zone.trigger(detections=tracked_detections)
-            
-            # Prepare frame for annotation
-            annotated_frame = frame.copy()
-            
-            # Draw trace paths
-            annotated_frame = self.trace_annotator.annotate(
-                scene=annotated_frame,
-                detections=tracked_detections
-            )
-            
-            # Draw boxes and labels (all as cars)
-            for i, (xyxy, confidence, _) in enumerate(zip(
-                tracked_detections.xyxy,
-                tracked_detections.confidence,
-                tracked_detections.class_id
-            )):
-                x1, y1, x2, y2 = map(int, xyxy)
-                cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                label = f"Car {confidence:.2f}"
-                cv2.putText(
-                    annotated_frame,
-                    label,
-                    (x1, y1-10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    (0, 255, 0),
-                    2
-                )
-            
-            # Draw line counter with improved visibility
-            line_color = (0, 255, 255)  # Yellow
-            cv2.line(
-                annotated_frame,
-                (int(self.line_start.x), int(self.line_start.y)),
-                (int(self.line_end.x), int(self.line_start.y)),
-                line_color,
-                4  # Thicker line
-            )
-            
-            # Add direction indicators with better visibility
-            mid_x = (self.line_start.x + self.line_end.x) // 2
-            
-            # Draw direction arrows
-            arrow_length = 50
-            arrow_color = (0, 255, 255)  # Yellow
-            
-            # IN arrow
-            cv2.arrowedLine(
-                annotated_frame,
-                (int(mid_x - 150), int(self.line_start.y - 40)),
-                (int(mid_x - 50), int(self.line_start.y - 40)),
-                arrow_color,
-                3,
-                tipLength=0.3
-            )
-            
-            # OUT arrow
-            cv2.arrowedLine(
-                annotated_frame,
-                (int(mid_x + 150), int(self.line_start.y - 40)),
-                (int(mid_x + 50), int(self.line_start.y - 40)),
-                arrow_color,
-                3,
-                tipLength=0.3
-            )
-            
-            # Add text with background for better visibility
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            font_scale = 1
-            thickness = 2
-            
-            # IN text
-            in_text = "IN"
-            (text_width, text_height), _ = cv2.getTextSize(in_text, font, font_scale, thickness)
-            cv2.rectangle(
-                annotated_frame,
-                (int(mid_x - 150 - 10), int(self.line_start.y - 40 - text_height - 10)),
-                (int(mid_x - 150 + text_width + 10), int(self.line_start.y - 40 + 10)),
-                (0, 0, 0),
-                -1
-            )
-            cv2.putText(
-                annotated_frame,
-                in_text,
-                (int(mid_x - 150), int(self.line_start.y - 40)),
-                font,
-                font_scale,
-                arrow_color,
-                thickness
-            )
-            
-            # OUT text
-            out_text = "OUT"
-            (text_width, text_height), _ = cv2.getTextSize(out_text, font, font_scale, thickness)
-            cv2.rectangle(
-                annotated_frame,
-                (int(mid_x + 150 - text_width - 10), int(self.line_start.y - 40 - text_height - 10)),
-                (int(mid_x + 150 + 10), int(self.line_start.y - 40 + 10)),
-                (0, 0, 0),
-                -1
-            )
-            cv2.putText(
-                annotated_frame,
-                out_text,
-                (int(mid_x + 150 - text_width), int(self.line_start.y - 40)),
-                font,
-                font_scale,
-                arrow_color,
-                thickness
-            )
-            
-            # In the process_frame method, update the count overlay with better design
-            # Add count overlay with improved design
-            # Create background for counts
-            overlay_height = 130
-            overlay_width = 250
-            overlay = annotated_frame[10:10+overlay_height, 10:10+overlay_width].copy()
-            cv2.rectangle(
-                annotated_frame,
-                (10, 10),
-                (10 + overlay_width, 10 + overlay_height),
-                (0, 0, 0),
-                -1
-            )
-            cv2.rectangle(
-                annotated_frame,
-                (10, 10),
-                (10 + overlay_width, 10 + overlay_height),
-                (0, 255, 255),  # Yellow border
-                2
-            )
-
-            # Add counts with improved styling
-            # IN count
-            cv2.putText(
-                annotated_frame,
-                "Cars IN:",
-                (20, 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 255, 255),  # Yellow text
-                2
-            )
-            cv2.putText(
-                annotated_frame,
-                str(self.line_zone.in_count),
-                (160, 40),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.0,
-                (0, 255, 0),  # Green number
-                2
-            )
-
-            # OUT count
-            cv2.putText(
-                annotated_frame,
-                "Cars OUT:",
-                (20, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 255, 255),  # Yellow text
-                2
-            )
-            cv2.putText(
-                annotated_frame,
-                str(self.line_zone.out_count),
-                (160, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.0,
-                (0, 255, 0),  # Green number
-                2
-            )
-
-            # Total count
-            cv2.putText(
-                annotated_frame,
-                "TOTAL:",
-                (20, 120),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (0, 255, 255),  # Yellow text
-                2
-            )
-            cv2.putText(
-                annotated_frame,
-                str(self.line_zone.in_count + self.line_zone.out_count),
-                (160, 120),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1.0,
-                (0, 255, 0),  # Green number
-                2
-            )
-            
-            return annotated_frame
-            
+            self.stats.save(self.stats_path)
         except Exception as e:
-            logging.error(f"Error processing frame {frame_number}: {str(e)}")
-            return frame
+            logging.error(f"Error saving traffic statistics: {str(e)}")
     
-    def process_video(self):
+    def process_video(self, backend: Optional[str] = None,
+                      progress_callback: Optional[Callable[[int, int], None]] = None):
         try:
-            def callback(frame: np.ndarray, frame_number: int) -> np.ndarray:
-                if frame_number % 30 == 0:
-                    logging.info(f"Processing frame {frame_number}")
-                return self.process_frame(frame, frame_number)
-            
-            sv.process_video(
-                source_path=self.source_path,
-                target_path=self.target_path,
-                callback=callback
-            )
+            with self.create_reader(backend) as reader, \
+                    sv.VideoSink(self.target_path, self.video_info) as sink:
+                for frame_index, _, _ in self.detector.stream(reader, sinks=[sink.write_frame]):
+                    if frame_index % 30 == 0:
+                        logging.info(f"Processing frame {frame_index}")
+                    if progress_callback is not None:
+                        progress_callback(frame_index + 1, reader.total_frames)
             
             logging.info("Video processing completed successfully")
             
+        except ProcessingCancelled:
+            logging.info("Video processing cancelled")
+            raise
         except Exception as e:
             logging.error(f"Error processing video: {str(e)}")
             raise
+        finally:
+            self.save_stats()
 
 def main():
     try:
@@ -0,0 +1,175 @@
+"""Evaluate speed/accuracy trade-offs of the optimization modes.
+
+Usage (from the project root):
+    python -m benchmarks.evaluate_tradeoffs clip1.mp4 clip2.mp4 [--matrix configs.json] [--roi x1,y1,x2,y2]
+
+Every configuration runs the full VehicleTrackingSystem pipeline on every
+reference clip. IN/OUT counts and crossing timestamps are compared with
+the reference configuration (the first entry of the matrix), and the
+result is printed as a table with the Pareto-optimal configurations of
+throughput against count error marked.
+
+A matrix file is a JSON list of objects with a "name" and any of the
+keys model, precision, imgsz, frame_skip, roi, tiled and tracker.
+"""
+import argparse
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from app_parking_management import VehicleTrackingSystem
+from src.config.settings import DATA_DIR, INFERENCE_SIZE, MODEL_PATH, MODELS_DIR, QUANTIZED_MODEL_PATH
+from src.detectors.vehicle_detector import load_model
+from src.utils.metrics import match_events
+
+DEFAULT_MATRIX = [
+    {"name": "reference", "model": MODEL_PATH.name},
+    {"name": "skip-1", "model": MODEL_PATH.name, "frame_skip": 1},
+    {"name": "skip-2", "model": MODEL_PATH.name, "frame_skip": 2},
+    {"name": "yolov8m", "model": "yolov8m.pt"},
+    {"name": "yolov8s", "model": "yolov8s.pt"},
+    {"name": "yolov8n", "model": "yolov8n.pt"},
+    {"name": "yolov8s-480", "model": "yolov8s.pt", "imgsz": 480},
+    {"name": "vectorized-tracker", "model": MODEL_PATH.name, "tracker": "vectorized"},
+    {"name": "int8", "precision": "int8"},
+]
+
+
+def run_config(config: dict, clip: Path, output_dir: Path) -> dict:
+    model = load_model(config.get("precision", "fp32"), MODELS_DIR / config.get("model", MODEL_PATH.name))
+    system = VehicleTrackingSystem(
+        str(clip),
+        str(output_dir / f"{clip.stem}_{config['name']}.mp4"),
+        imgsz=config.get("imgsz", INFERENCE_SIZE),
+        tiled=config.get("tiled", False),
+        model=model,
+        tracker=config.get("tracker", "bytetrack"),
+        auto_tune=False,
+        frame_skip=config.get("frame_skip", 0),
+        roi=config.get("roi"),
+    )
+    start = time.perf_counter()
+    system.process_video()
+    elapsed = time.perf_counter() - start
+
+    fps = system.video_info.fps
+    # One timestamp per counted vehicle, in seconds of video time
+    times = {"in": [], "out": []}
+    for frame_number, direction, count in system.crossing_events:
+        times[direction].extend([frame_number / fps] * count)
+    return {
+        "frames": system.video_info.total_frames,
+        "seconds": elapsed,
+        "in": system.line_zone.in_count,
+        "out": system.line_zone.out_count,
+        "times": times,
+    }
+
+
+def compare_runs(reference: dict, run: dict, tolerance: float) -> dict:
+    reference_total = reference["in"] + reference["out"]
+    count_error = abs(run["in"] - reference["in"]) + abs(run["out"] - reference["out"])
+    matched, offset_sum = 0, 0.0
+    for direction in ("in", "out"):
+        n, mean_offset = match_events(reference["times"][direction], run["times"][direction], tolerance)
+        matched += n
+        offset_sum += n * mean_offset
+    run_total = run["in"] + run["out"]
+    return {
+        "count_error": count_error,
+        "reference_total": reference_total,
+        "matched": matched,
+        "run_total": run_total,
+        "offset_sum": offset_sum,
+    }
+
+
+def pareto_front(rows: List[dict]) -> set:
+    """Names of rows not beaten on both throughput and count error by another row."""
+    front = set()
+    for row in rows:
+        dominated = any(
+            other["fps"] >= row["fps"] and other["count_error"] <= row["count_error"]
+            and (other["fps"] > row["fps"] or other["count_error"] < row["count_error"])
+            for other in rows
+        )
+        if not dominated:
+            front.add(row["name"])
+    return front
+
+
+def evaluate(clips: List[Path], matrix: List[dict], tolerance: float) -> List[dict]:
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        reference_runs = {clip: run_config(matrix[0], clip, Path(output_dir)) for clip in clips}
+        for config in matrix:
+            frames = seconds = count_error = reference_total = matched = run_total = 0
+            offset_sum = 0.0
+            for clip in clips:
+                reference = reference_runs[clip]
+                run = reference if config is matrix[0] else run_config(config, clip, Path(output_dir))
+                comparison = compare_runs(reference, run, tolerance)
+                frames += run["frames"]
+                seconds += run["seconds"]
+                count_error += comparison["count_error"]
+                reference_total += comparison["reference_total"]
+                matched += comparison["matched"]
+                run_total += comparison["run_total"]
+                offset_sum += comparison["offset_sum"]
+
+            precision = matched / run_total if run_total else 1.0
+            recall = matched / reference_total if reference_total else 1.0
+            rows.append({
+                "name": config["name"],
+                "fps": frames / seconds,
+                "count_error": count_error / max(reference_total, 1),
+                "crossing_f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+                "mean_offset_s": offset_sum / matched if matched else 0.0,
+            })
+            print(f"Evaluated {config['name']}: {rows[-1]['fps']:.1f} FPS")
+
+    front = pareto_front(rows)
+    for row in rows:
+        row["pareto"] = row["name"] in front
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speed/accuracy trade-off evaluation")
+    parser.add_argument("clips", nargs="+", type=Path)
+    parser.add_argument("--matrix", type=Path, help="JSON list of configurations, first is the reference")
+    parser.add_argument("--roi", help="add an ROI configuration, x1,y1,x2,y2 in pixels")
+    parser.add_argument("--tiled", action="store_true", help="add a tiled inference configuration")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="seconds within which a crossing matches the reference")
+    parser.add_argument("--output", type=Path, default=DATA_DIR / "evaluation" / "tradeoffs.csv")
+    args = parser.parse_args()
+
+    matrix = json.loads(args.matrix.read_text()) if args.matrix else list(DEFAULT_MATRIX)
+    if not args.matrix and not QUANTIZED_MODEL_PATH.exists():
+        matrix = [config for config in matrix if config.get("precision") != "int8"]
+    if args.roi:
+        matrix.append({"name": "roi", "model": MODEL_PATH.name, "roi": [int(v) for v in args.roi.split(",")]})
+    if args.tiled:
+        matrix.append({"name": "tiled", "model": MODEL_PATH.name, "tiled": True})
+
+    rows = evaluate(args.clips, matrix, args.tolerance)
+
+    print(f"\n{'configuration':<22}{'FPS':>8}{'count err':>11}{'crossing F1':>13}{'offset s':>10}  pareto")
+    for row in sorted(rows, key=lambda r: -r["fps"]):
+        print(f"{row['name']:<22}{row['fps']:>8.1f}{row['count_error']:>10.1%}"
+              f"{row['crossing_f1']:>13.3f}{row['mean_offset_s']:>10.2f}  {'*' if row['pareto'] else ''}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
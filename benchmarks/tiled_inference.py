@@ -0,0 +1,90 @@
+"""Compare tiled inference against full-frame inference at a large imgsz.
+
+Usage (from the project root):
+    python -m benchmarks.tiled_inference path/to/video.mp4 --frames 50
+"""
+import argparse
+import time
+from itertools import islice
+
+import numpy as np
+import supervision as sv
+from ultralytics import YOLO
+
+from src.config.settings import MODEL_PATH, TARGET_FPS
+from src.detectors.tiled_inference import TiledInference
+from src.detectors.vehicle_detector import VehicleDetector
+from src.utils.metrics import match_boxes
+from src.utils.video_reader import DecodedFrame, letterbox, make_divisible
+
+
+def full_frame_detector(model, video_info: sv.VideoInfo, imgsz: int):
+    """Full-frame detection through the engine's hot path, on decode-stage tensors."""
+    detector = VehicleDetector(video_info.width, video_info.height, model=model, imgsz=imgsz,
+                               tiled=False, roi=None)
+    size = make_divisible(imgsz)
+
+    def detect(frame: np.ndarray) -> sv.Detections:
+        return detector.detect(frame, DecodedFrame(0, frame, *letterbox(frame, size)))
+    return detect
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--frames", type=int, default=50, help="number of sampled frames")
+    parser.add_argument("--stride", type=int, default=10, help="sample every n-th frame")
+    parser.add_argument("--model", default=str(MODEL_PATH))
+    parser.add_argument("--imgsz", type=int, default=640, help="default full-frame size")
+    parser.add_argument("--large-imgsz", type=int, default=1280, help="reference full-frame size")
+    parser.add_argument("--target-fps", type=float, default=TARGET_FPS)
+    args = parser.parse_args()
+
+    model = YOLO(args.model)
+    video_info = sv.VideoInfo.from_video_path(args.video)
+    tiler = TiledInference.auto(model, video_info.width, video_info.height, args.target_fps)
+
+    frames = list(islice(sv.get_video_frames_generator(args.video, stride=args.stride), args.frames))
+    full_frame_detect = full_frame_detector(model, video_info, args.imgsz)
+    large_frame_detect = full_frame_detector(model, video_info, args.large_imgsz)
+    # Warm up every mode so the first measurement is not skewed
+    full_frame_detect(frames[0])
+    large_frame_detect(frames[0])
+    tiler.detect(frames[0])
+
+    modes = {
+        f"full-frame imgsz={args.imgsz}": full_frame_detect,
+        f"tiled {tiler.plan.count}x{tiler.plan.tile_size}px": tiler.detect,
+    }
+    latencies = {name: [] for name in modes}
+    scores = {name: [] for name in modes}
+    reference_latency = []
+
+    for frame in frames:
+        reference, elapsed = timed(large_frame_detect, frame)
+        reference_latency.append(elapsed)
+        for name, detect in modes.items():
+            detections, elapsed = timed(detect, frame)
+            latencies[name].append(elapsed)
+            scores[name].append(match_boxes(reference.xyxy, detections.xyxy))
+
+    print(f"\nReference: full-frame imgsz={args.large_imgsz}, "
+          f"{1.0 / np.mean(reference_latency):.1f} FPS over {len(frames)} frames")
+    print(f"{'mode':<28}{'FPS':>8}{'speedup':>10}{'precision':>11}{'recall':>9}{'F1':>7}")
+    for name in modes:
+        fps = 1.0 / np.mean(latencies[name])
+        speedup = np.mean(reference_latency) / np.mean(latencies[name])
+        precision = np.mean([s.precision for s in scores[name]])
+        recall = np.mean([s.recall for s in scores[name]])
+        f1 = np.mean([s.f1 for s in scores[name]])
+        print(f"{name:<28}{fps:>8.1f}{speedup:>9.2f}x{precision:>11.3f}{recall:>9.3f}{f1:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark tracker latency and line-count agreement on synthetic traffic.
+
+Usage (from the project root):
+    python -m benchmarks.tracker_benchmark --objects 10 100 500 --frames 300
+"""
+import argparse
+import time
+
+import numpy as np
+import supervision as sv
+
+from src.detectors.trackers import TRACKERS, create_tracker
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+LINE_Y = FRAME_HEIGHT // 2
+
+
+class TrafficSimulation:
+    """Boxes moving up or down across a horizontal counting line.
+
+    Every vehicle that leaves the frame is replaced by a new one, so the
+    number of objects per frame stays constant.
+    """
+
+    def __init__(self, objects: int, seed: int = 0, miss_rate: float = 0.05, jitter: float = 1.5):
+        self.rng = np.random.default_rng(seed)
+        self.miss_rate = miss_rate
+        self.jitter = jitter
+        self.sizes = self.rng.uniform(24, 56, size=(objects, 2))
+        self.centers = np.column_stack([
+            self.rng.uniform(0, FRAME_WIDTH, objects),
+            self.rng.uniform(0, FRAME_HEIGHT, objects),
+        ])
+        self.speeds = self._random_speeds(objects)
+        self.in_count = 0
+        self.out_count = 0
+
+    def _random_speeds(self, count: int) -> np.ndarray:
+        direction = self.rng.choice([-1, 1], size=count)
+        return np.column_stack([
+            self.rng.normal(0, 0.5, count),
+            direction * self.rng.uniform(2, 8, count),
+        ])
+
+    def step(self) -> sv.Detections:
+        previous_y = self.centers[:, 1].copy()
+        self.centers += self.speeds
+        crossed = np.sign(previous_y - LINE_Y) != np.sign(self.centers[:, 1] - LINE_Y)
+        # Same direction convention as LineZone with a left-to-right line
+        self.in_count += int(np.sum(crossed & (self.speeds[:, 1] < 0)))
+        self.out_count += int(np.sum(crossed & (self.speeds[:, 1] > 0)))
+
+        # Respawn vehicles that left the frame at the opposite edge
+        gone = (self.centers[:, 1] < -60) | (self.centers[:, 1] > FRAME_HEIGHT + 60)
+        if gone.any():
+            self.speeds[gone] = self._random_speeds(int(gone.sum()))
+            self.centers[gone, 0] = self.rng.uniform(0, FRAME_WIDTH, int(gone.sum()))
+            self.centers[gone, 1] = np.where(self.speeds[gone, 1] > 0, -50, FRAME_HEIGHT + 50)
+
+        noisy = self.centers + self.rng.normal(0, self.jitter, self.centers.shape)
+        xyxy = np.column_stack([noisy - self.sizes / 2, noisy + self.sizes / 2])
+        visible = self.rng.random(len(xyxy)) >= self.miss_rate
+        return sv.Detections(
+            xyxy=xyxy[visible].astype(np.float32),
+            confidence=self.rng.uniform(0.4, 0.95, int(visible.sum())).astype(np.float32),
+            class_id=np.full(int(visible.sum()), 2),
+        )
+
+
+def run(tracker_type: str, objects: int, frames: int, seed: int) -> dict:
+    simulation = TrafficSimulation(objects, seed)
+    tracker = create_tracker(tracker_type)
+    line_zone = sv.LineZone(start=sv.Point(0, LINE_Y), end=sv.Point(FRAME_WIDTH, LINE_Y))
+    latencies = []
+
+    for _ in range(frames):
+        detections = simulation.step()
+        start = time.perf_counter()
+        tracked = tracker.update_with_detections(detections)
+        latencies.append(time.perf_counter() - start)
+        line_zone.trigger(detections=tracked)
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "mean_ms": latencies.mean(),
+        "p95_ms": np.percentile(latencies, 95),
+        "in": line_zone.in_count,
+        "out": line_zone.out_count,
+        "true_in": simulation.in_count,
+        "true_out": simulation.out_count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--trackers", nargs="+", default=list(TRACKERS), choices=list(TRACKERS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'tracker':<12}{'mean ms':>9}{'p95 ms':>9}"
+          f"{'IN':>7}{'OUT':>7}{'true IN':>9}{'true OUT':>9}{'count err':>11}{'vs first':>10}")
+    for objects in args.objects:
+        results = {name: run(name, objects, args.frames, args.seed) for name in args.trackers}
+        baseline = results[args.trackers[0]]
+        for name, r in results.items():
+            true_total = max(r["true_in"] + r["true_out"], 1)
+            error = (abs(r["in"] - r["true_in"]) + abs(r["out"] - r["true_out"])) / true_total
+            # Count agreement with the first tracker (ByteTrack by default)
+            base_total = max(baseline["in"] + baseline["out"], 1)
+            agreement = 1 - (abs(r["in"] - baseline["in"]) + abs(r["out"] - baseline["out"])) / base_total
+            print(f"{objects:>8} {name:<12}{r['mean_ms']:>9.2f}{r['p95_ms']:>9.2f}"
+                  f"{r['in']:>7}{r['out']:>7}{r['true_in']:>9}{r['true_out']:>9}"
+                  f"{error:>10.1%}{agreement:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,60 @@ for dir_path in [INPUT_DIR, OUTPUT_DIR, MODELS_DIR, LOGS_DIR]:
 
 # Model settings
 MODEL_PATH = MODELS_DIR / "yolov8x.pt"
+MODEL_PRECISION = "fp32"  # "fp32" or "int8" (OpenVINO model calibrated on our footage)
+QUANTIZED_MODEL_PATH = MODELS_DIR / f"{MODEL_PATH.stem}_int8_openvino_model"
+CALIBRATION_DIR = DATA_DIR / "calibration"
+CALIBRATION_FRAMES = 300  # frames sampled from INPUT_DIR videos for INT8 calibration
 VEHICLE_CLASSES = [2, 3, 5, 7]  # car, motorcycle, bus, truck
 
 # Video processing settings
 CONFIDENCE_THRESHOLD = 0.3
-LINE_POSITION = 0.7  # 70% of frame height 
\ No newline at end of file
+LINE_POSITION = 0.7  # 70% of frame height
+FRAME_SKIP = 0  # frames skipped between detections, skipped frames reuse the last tracks
+ROI = None  # (x1, y1, x2, y2) pixel area to run detection on, None for the full frame
+
+# Auto-tuning settings (pick model size and input size from the target FPS)
+AUTO_TUNE = False
+AUTOTUNE_MODELS = ["yolov8n.pt", "yolov8s.pt", "yolov8m.pt", "yolov8l.pt", "yolov8x.pt"]
+AUTOTUNE_SIZES = [320, 480, 640, 960, 1280]
+AUTOTUNE_SAMPLE_FRAMES = 30  # frames sampled from the input video for benchmarking
+AUTOTUNE_REALTIME_FACTOR = None  # e.g. 1.0 to keep up with the video FPS, overrides TARGET_FPS
+AUTOTUNE_CACHE = MODELS_DIR / "autotune_cache.json"
+
+# Decoding settings
+DECODE_BACKEND = "opencv"  # "opencv" or "pyav" (threaded decoding)
+DECODE_THREADS = 0  # 0 lets the decoder pick the thread count
+DECODE_QUEUE_SIZE = 8  # frames buffered between decode and inference
+INFERENCE_SIZE = 640  # letterboxed input size fed to YOLO
+
+# Raw frame cache settings (decode a clip once, serve later runs from a memory-mapped file)
+FRAME_CACHE_ENABLED = False
+FRAME_CACHE_DIR = DATA_DIR / "frame_cache"
+FRAME_CACHE_MAX_BYTES = 20 * 1024 ** 3  # least recently used clips are evicted above this
+FRAME_CACHE_SCALE = 1.0  # < 1.0 stores downscaled frames (ROI and line geometry follow the scaled size)
+
+# Tiled inference settings
+TILED_INFERENCE = False  # split high-resolution frames into overlapping tiles
+TILE_SIZES = [640, 960, 1280]  # candidate tile sizes, smallest keeps the most detail
+TILE_OVERLAP = 0.2  # fraction of the tile shared with its neighbours
+TILE_NMS_THRESHOLD = 0.5  # IoU used to merge duplicates across tiles
+TARGET_FPS = 15  # throughput the automatic tile plan has to reach
+
+# GUI processing settings
+PROCESSING_MODE = "process"  # "process" (separate worker process) or "thread" (QThread in the GUI)
+PREVIEW_SIZE = (1280, 720)  # max width, height of preview frames sent to the GUI
+FRAME_RING_SLOTS = 4  # preview frames held in the shared memory ring
+
+# Job server settings
+JOB_SERVER_HOST = "127.0.0.1"
+JOB_SERVER_PORT = 8765
+JOB_SERVER_WORKERS = 2  # worker processes, each keeps its own loaded model
+
+# Tracking settings
+TRACKER_TYPE = "bytetrack"  # "bytetrack" or "vectorized" (IoU/centroid, cheaper on CPU)
+
+# Traffic statistics settings (time-bucketed IN/OUT aggregates, saved per video)
+STATS_DIR = DATA_DIR / "stats"
+STATS_MINUTE_BUCKETS = 24 * 60  # per-minute buckets kept in the ring (one day)
+STATS_HOUR_BUCKETS = 30 * 24  # per-hour buckets kept in the ring (30 days)
+STATS_CHART_MINUTES = 60  # minutes shown in the live chart
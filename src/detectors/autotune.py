@@ -0,0 +1,211 @@
+"""Pick the detection model and input size that fit this machine.
+
+Usage (from the project root):
+    python -m src.detectors.autotune path/to/video.mp4 [--target-fps 15 | --realtime-factor 1.0] [--force]
+
+Every candidate model and input size is timed on frames sampled from the
+video, through the same letterboxed-tensor detection and tracking path the
+pipeline runs. Accuracy is the detection F1 against the largest model at the
+largest input size on the same frames. The most accurate candidate that
+reaches the target FPS wins, and the result is cached per host so later
+runs start with it directly.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import time
+from itertools import islice
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+import supervision as sv
+import torch
+from ultralytics import YOLO
+
+from ..config.settings import (AUTOTUNE_CACHE, AUTOTUNE_MODELS, AUTOTUNE_REALTIME_FACTOR,
+                               AUTOTUNE_SAMPLE_FRAMES, AUTOTUNE_SIZES, CONFIDENCE_THRESHOLD,
+                               FRAME_CACHE_ENABLED, FRAME_CACHE_SCALE, MODELS_DIR, ROI, TARGET_FPS,
+                               TILED_INFERENCE, TRACKER_TYPE)
+from ..utils.frame_cache import FrameCache, scaled_size
+from ..utils.metrics import match_boxes
+from ..utils.video_reader import DecodedFrame, letterbox, make_divisible
+from .vehicle_detector import VehicleDetector
+
+
+def host_key() -> str:
+    if torch.cuda.is_available():
+        device = torch.cuda.get_device_name(0)
+    else:
+        device = f"{platform.processor() or platform.machine()} x{os.cpu_count()}"
+    return f"{platform.node()}|{device}"
+
+
+def target_fps_for(video_info: sv.VideoInfo, target_fps: Optional[float] = None,
+                   realtime_factor: Optional[float] = AUTOTUNE_REALTIME_FACTOR) -> float:
+    if target_fps is not None:
+        return target_fps
+    if realtime_factor is not None:
+        return video_info.fps * realtime_factor
+    return TARGET_FPS
+
+
+def sample_frames(source_path: str, count: int = AUTOTUNE_SAMPLE_FRAMES) -> List[np.ndarray]:
+    video_info = sv.VideoInfo.from_video_path(source_path)
+    stride = max(1, (video_info.total_frames or count) // count)
+    frames = list(islice(sv.get_video_frames_generator(source_path, stride=stride), count))
+    if FRAME_CACHE_ENABLED and frames and FrameCache().fits(source_path):
+        # The pipeline runs on the cached frames, time candidates at the same size
+        size = scaled_size(video_info.width, video_info.height)
+        if size != (video_info.width, video_info.height):
+            frames = [cv2.resize(frame, size, interpolation=cv2.INTER_AREA) for frame in frames]
+    return frames
+
+
+def benchmark_candidate(model: YOLO, frames: List[np.ndarray], imgsz: int,
+                        reference: Optional[List[np.ndarray]] = None) -> dict:
+    # Same hot path as production: decode-stage tensors through VehicleDetector.detect and
+    # the tracker, with the configured confidence and ROI
+    height, width = frames[0].shape[:2]
+    detector = VehicleDetector(width, height, model=model, imgsz=imgsz, tiled=False)
+    size = make_divisible(imgsz)
+    # Letterboxing runs on the reader thread in production, so it stays out of the timing
+    decoded = [DecodedFrame(i, frame, *letterbox(frame, size)) for i, frame in enumerate(frames)]
+
+    detector.detect(decoded[0].frame, decoded[0])  # warmup
+    boxes = []
+    start = time.perf_counter()
+    for item in decoded:
+        detections = detector.detect(item.frame, item)
+        detector.object_tracker.update_with_detections(detections)
+        boxes.append(detections.xyxy)
+    fps = len(frames) / (time.perf_counter() - start)
+
+    accuracy = 1.0
+    if reference is not None:
+        accuracy = float(np.mean([match_boxes(ref, b).f1 for ref, b in zip(reference, boxes)]))
+    return {"fps": fps, "accuracy": accuracy, "boxes": boxes}
+
+
+def tune(source_path: str, target_fps: float, models: List[str] = AUTOTUNE_MODELS,
+         sizes: List[int] = AUTOTUNE_SIZES) -> dict:
+    frames = sample_frames(source_path)
+    if not frames:
+        raise ValueError(f"Could not read frames from {source_path}")
+    sizes = sorted(sizes)
+    models = list(models)
+
+    # The largest model at the largest size is the accuracy reference
+    reference_model = YOLO(str(MODELS_DIR / models[-1]))
+    reference = benchmark_candidate(reference_model, frames, sizes[-1])
+    results = [{"model": models[-1], "imgsz": sizes[-1], "fps": reference["fps"], "accuracy": 1.0}]
+
+    for model_name in models:
+        model = reference_model if model_name == models[-1] else YOLO(str(MODELS_DIR / model_name))
+        for imgsz in sizes:
+            if model_name == models[-1] and imgsz == sizes[-1]:
+                continue
+            result = benchmark_candidate(model, frames, imgsz, reference["boxes"])
+            results.append({"model": model_name, "imgsz": imgsz,
+                            "fps": result["fps"], "accuracy": result["accuracy"]})
+            logging.info(
+                f"Auto-tune {model_name} @ {imgsz}: {result['fps']:.1f} FPS, "
+                f"accuracy {result['accuracy']:.3f}"
+            )
+            if result["fps"] < target_fps:
+                break  # larger inputs of this model will be slower still
+
+    feasible = [r for r in results if r["fps"] >= target_fps]
+    if feasible:
+        choice = max(feasible, key=lambda r: (r["accuracy"], r["fps"]))
+    else:
+        logging.warning(f"No configuration reaches {target_fps:.1f} FPS, using the fastest one")
+        choice = max(results, key=lambda r: r["fps"])
+    return dict(choice, target_fps=target_fps, candidates=results, tuned_at=time.time())
+
+
+# Bumped when the measurement changes, older cached results are re-tuned
+CACHE_VERSION = 3
+
+
+def cache_key(video_info: sv.VideoInfo, target_fps: float) -> str:
+    # Cost scales with resolution and target, and the settings the benchmark runs with
+    # change both the timing and the reference boxes, so all of them are part of the key
+    scale = FRAME_CACHE_SCALE if FRAME_CACHE_ENABLED else 1.0
+    roi = ",".join(str(int(v)) for v in ROI) if ROI is not None else "full"
+    return (
+        f"v{CACHE_VERSION}|{video_info.width}x{video_info.height}@{target_fps:.1f}"
+        f"|scale={scale:g}|roi={roi}|tracker={TRACKER_TYPE}|conf={CONFIDENCE_THRESHOLD:g}"
+    )
+
+
+def _save_cache(cache: dict, cache_path: Path):
+    # Written to a temporary file first, a crash or a second process never leaves a torn file
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(cache, indent=2))
+    os.replace(tmp_path, cache_path)
+
+
+def _load_cache(cache_path: Path) -> dict:
+    if cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text())
+        except json.JSONDecodeError:
+            logging.warning(f"Ignoring unreadable auto-tune cache {cache_path}")
+    return {}
+
+
+def select_configuration(source_path: str, target_fps: Optional[float] = None,
+                         force: bool = False, cache_path: Path = AUTOTUNE_CACHE) -> Tuple[Path, int]:
+    """Return (model_path, imgsz) for this host, tuning only on a cache miss."""
+    video_info = sv.VideoInfo.from_video_path(source_path)
+    target_fps = target_fps_for(video_info, target_fps)
+    key = cache_key(video_info, target_fps)
+
+    cache = _load_cache(cache_path)
+    entry = cache.get(host_key(), {}).get(key)
+    if entry is None or force:
+        entry = tune(source_path, target_fps)
+        # Tuning takes a while, merge into what other processes stored meanwhile
+        cache = _load_cache(cache_path)
+        cache.setdefault(host_key(), {})[key] = entry
+        _save_cache(cache, cache_path)
+
+    logging.info(
+        f"Auto-tune selected {entry['model']} @ {entry['imgsz']} "
+        f"({entry['fps']:.1f} FPS, accuracy {entry['accuracy']:.3f})"
+    )
+    return MODELS_DIR / entry["model"], entry["imgsz"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auto-tune model and input size for this machine")
+    parser.add_argument("video")
+    parser.add_argument("--target-fps", type=float, default=None)
+    parser.add_argument("--realtime-factor", type=float, default=None,
+                        help="target as a multiple of the video FPS")
+    parser.add_argument("--force", action="store_true", help="ignore the cached result")
+    args = parser.parse_args()
+    if TILED_INFERENCE:
+        parser.error("auto-tune times full-frame inference, disable TILED_INFERENCE first")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    video_info = sv.VideoInfo.from_video_path(args.video)
+    realtime_factor = args.realtime_factor if args.realtime_factor is not None else AUTOTUNE_REALTIME_FACTOR
+    target_fps = target_fps_for(video_info, args.target_fps, realtime_factor)
+
+    model_path, imgsz = select_configuration(args.video, target_fps, force=args.force)
+    tuned = _load_cache(AUTOTUNE_CACHE)[host_key()][cache_key(video_info, target_fps)]
+    print(f"\n{host_key()}, {video_info.width}x{video_info.height}, target {target_fps:.1f} FPS")
+    print(f"{'model':<14}{'imgsz':>7}{'FPS':>9}{'accuracy':>10}")
+    for r in tuned["candidates"]:
+        marker = " <" if (r["model"], r["imgsz"]) == (tuned["model"], tuned["imgsz"]) else ""
+        print(f"{r['model']:<14}{r['imgsz']:>7}{r['fps']:>9.1f}{r['accuracy']:>10.3f}{marker}")
+    print(f"\nSelected: {model_path} @ {imgsz}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""INT8 quantization of the detection model, calibrated on our own footage.
+
+Usage (from the project root):
+    python -m src.detectors.quantization [--frames 300] [--clip data/input/reference.mp4]
+
+Samples calibration frames from the videos in INPUT_DIR, exports an INT8
+OpenVINO model next to MODEL_PATH and reports speed, size and count drift
+of the INT8 model against FP32 on a reference clip. Set
+MODEL_PRECISION = "int8" in settings.py to use the quantized model.
+"""
+import argparse
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from app_parking_management import VehicleTrackingSystem
+from ..config.settings import (CALIBRATION_DIR, CALIBRATION_FRAMES, INFERENCE_SIZE,
+                               INPUT_DIR, MODEL_PATH, QUANTIZED_MODEL_PATH)
+from .vehicle_detector import load_model
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def find_videos(input_dir: Path = INPUT_DIR) -> List[Path]:
+    return sorted(p for p in Path(input_dir).iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS)
+
+
+def sample_calibration_frames(videos: List[Path], frames: int = CALIBRATION_FRAMES,
+                              output_dir: Path = CALIBRATION_DIR) -> Path:
+    """Write frames spread evenly over all videos and return the image folder."""
+    image_dir = output_dir / "images"
+    if image_dir.exists():
+        shutil.rmtree(image_dir)
+    image_dir.mkdir(parents=True)
+
+    per_video = max(1, frames // len(videos))
+    written = 0
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for index in np.linspace(0, max(total - 1, 0), per_video, dtype=int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            cv2.imwrite(str(image_dir / f"{video.stem}_{index:06d}.jpg"), frame)
+            written += 1
+        cap.release()
+
+    if written == 0:
+        raise ValueError("No calibration frames could be read from the input videos")
+    logging.info(f"Wrote {written} calibration frames to {image_dir}")
+    return image_dir
+
+
+def write_dataset_yaml(image_dir: Path, names: dict) -> Path:
+    # Ultralytics reads calibration images from the 'val' split of a dataset file
+    yaml_path = image_dir.parent / "calibration.yaml"
+    lines = [f"path: {image_dir.parent}", "train: images", "val: images", "names:"]
+    lines += [f"  {class_id}: {name}" for class_id, name in names.items()]
+    yaml_path.write_text("\n".join(lines) + "\n")
+    return yaml_path
+
+
+def export_int8(model_path: Path = MODEL_PATH, frames: int = CALIBRATION_FRAMES,
+                imgsz: int = INFERENCE_SIZE) -> Path:
+    videos = find_videos()
+    if not videos:
+        raise ValueError(f"No videos found in {INPUT_DIR} for calibration")
+
+    model = YOLO(str(model_path))
+    image_dir = sample_calibration_frames(videos, frames)
+    dataset = write_dataset_yaml(image_dir, model.names)
+
+    # Dynamic batch and spatial dims: tiled inference sends batches of larger tiles and the
+    # decode stage produces rectangular tensors, imgsz only sizes the calibration images
+    exported = Path(model.export(format="openvino", int8=True, dynamic=True, data=str(dataset),
+                                 imgsz=imgsz))
+    if exported.resolve() != QUANTIZED_MODEL_PATH.resolve():
+        if QUANTIZED_MODEL_PATH.exists():
+            shutil.rmtree(QUANTIZED_MODEL_PATH)
+        shutil.move(str(exported), str(QUANTIZED_MODEL_PATH))
+    logging.info(f"INT8 model saved to {QUANTIZED_MODEL_PATH}")
+    return QUANTIZED_MODEL_PATH
+
+
+def model_size_mb(path: Path) -> float:
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / (1024 * 1024)
+    return path.stat().st_size / (1024 * 1024)
+
+
+def run_reference(clip: Path, precision: str, output_dir: Path) -> dict:
+    tracker = VehicleTrackingSystem(
+        str(clip), str(output_dir / f"{clip.stem}_{precision}.mp4"), model=load_model(precision)
+    )
+    start = time.perf_counter()
+    tracker.process_video()
+    elapsed = time.perf_counter() - start
+    return {
+        "fps": tracker.video_info.total_frames / elapsed,
+        "in": tracker.line_zone.in_count,
+        "out": tracker.line_zone.out_count,
+    }
+
+
+def compare(clip: Path) -> dict:
+    with tempfile.TemporaryDirectory() as output_dir:
+        fp32 = run_reference(clip, "fp32", Path(output_dir))
+        int8 = run_reference(clip, "int8", Path(output_dir))
+
+    fp32_total = max(fp32["in"] + fp32["out"], 1)
+    report = {
+        "fp32": fp32,
+        "int8": int8,
+        "speedup": int8["fps"] / fp32["fps"],
+        "fp32_size_mb": model_size_mb(MODEL_PATH),
+        "int8_size_mb": model_size_mb(QUANTIZED_MODEL_PATH),
+        "count_drift": (abs(int8["in"] - fp32["in"]) + abs(int8["out"] - fp32["out"])) / fp32_total,
+    }
+
+    print(f"\nReference clip: {clip}")
+    print(f"{'model':<8}{'FPS':>8}{'IN':>6}{'OUT':>6}{'size MB':>10}")
+    print(f"{'FP32':<8}{fp32['fps']:>8.1f}{fp32['in']:>6}{fp32['out']:>6}{report['fp32_size_mb']:>10.1f}")
+    print(f"{'INT8':<8}{int8['fps']:>8.1f}{int8['in']:>6}{int8['out']:>6}{report['int8_size_mb']:>10.1f}")
+    print(f"Speedup: {report['speedup']:.2f}x, count drift: {report['count_drift']:.1%}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the detection model to INT8")
+    parser.add_argument("--frames", type=int, default=CALIBRATION_FRAMES, help="calibration frames")
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_SIZE, help="calibration image size")
+    parser.add_argument("--clip", type=Path, default=None,
+                        help="reference clip for the report (default: first video in INPUT_DIR)")
+    parser.add_argument("--skip-export", action="store_true", help="only report on an existing INT8 model")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        export_int8(frames=args.frames, imgsz=args.imgsz)
+
+    clip: Optional[Path] = args.clip
+    if clip is None:
+        videos = find_videos()
+        if not videos:
+            raise SystemExit(f"No reference clip given and no videos in {INPUT_DIR}")
+        clip = videos[0]
+    compare(clip)
+
+
+if __name__ == "__main__":
+    main()
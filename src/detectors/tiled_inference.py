@@ -0,0 +1,118 @@
+import logging
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import supervision as sv
+
+from ..config.settings import (CONFIDENCE_THRESHOLD, TARGET_FPS, TILE_NMS_THRESHOLD,
+                               TILE_OVERLAP, TILE_SIZES, VEHICLE_CLASSES)
+
+
+class TilePlan(NamedTuple):
+    tile_size: int
+    overlap: float
+    offsets: List[Tuple[int, int]]  # top-left corner of every tile
+    roi: Tuple[int, int, int, int]  # x1, y1, x2, y2 area covered by the tiles
+
+    @property
+    def count(self) -> int:
+        return len(self.offsets)
+
+
+def _axis_offsets(start: int, length: int, tile_size: int, overlap: float) -> List[int]:
+    if length <= tile_size:
+        return [start]
+    step = max(1, int(tile_size * (1 - overlap)))
+    offsets = list(range(start, start + length - tile_size, step))
+    # Align the last tile with the edge instead of producing a partial tile
+    offsets.append(start + length - tile_size)
+    return offsets
+
+
+def make_tile_plan(width: int, height: int, tile_size: int, overlap: float = TILE_OVERLAP,
+                   roi: Optional[Tuple[int, int, int, int]] = None) -> TilePlan:
+    x1, y1, x2, y2 = roi if roi is not None else (0, 0, width, height)
+    xs = _axis_offsets(x1, x2 - x1, tile_size, overlap)
+    ys = _axis_offsets(y1, y2 - y1, tile_size, overlap)
+    return TilePlan(tile_size, overlap, [(x, y) for y in ys for x in xs], (x1, y1, x2, y2))
+
+
+class TiledInference:
+    """Runs YOLO on overlapping tiles as one batch and merges the results.
+
+    Tiles are cut at native resolution, so small, distant vehicles keep
+    their pixels instead of being downsampled with the whole frame.
+    """
+
+    def __init__(self, model, plan: TilePlan, vehicle_classes: Sequence[int] = VEHICLE_CLASSES,
+                 nms_threshold: float = TILE_NMS_THRESHOLD, confidence: float = CONFIDENCE_THRESHOLD):
+        self.model = model
+        self.plan = plan
+        self.vehicle_classes = list(vehicle_classes)
+        self.nms_threshold = nms_threshold
+        self.confidence = confidence
+        logging.info(f"Tiled inference: {plan.count} tiles of {plan.tile_size}px")
+
+    @classmethod
+    def auto(cls, model, width: int, height: int, target_fps: float = TARGET_FPS,
+             roi: Optional[Tuple[int, int, int, int]] = None, **kwargs) -> "TiledInference":
+        return cls(model, select_tile_plan(model, width, height, target_fps, roi=roi), **kwargs)
+
+    def crop_tiles(self, frame: np.ndarray) -> List[np.ndarray]:
+        size = self.plan.tile_size
+        _, _, x2, y2 = self.plan.roi
+        # Views into the frame, no copies until the model letterboxes them
+        return [frame[y:min(y + size, y2), x:min(x + size, x2)] for x, y in self.plan.offsets]
+
+    def detect(self, frame: np.ndarray) -> sv.Detections:
+        tiles = self.crop_tiles(frame)
+        results = self.model(tiles, imgsz=self.plan.tile_size, conf=self.confidence, verbose=False)
+
+        tile_detections = []
+        for (x, y), result in zip(self.plan.offsets, results):
+            detections = sv.Detections.from_ultralytics(result)
+            detections = detections[np.isin(detections.class_id, self.vehicle_classes)]
+            if len(detections) == 0:
+                continue
+            detections.xyxy = detections.xyxy + np.array([x, y, x, y], dtype=detections.xyxy.dtype)
+            tile_detections.append(detections)
+
+        if not tile_detections:
+            return sv.Detections.empty()
+        merged = sv.Detections.merge(tile_detections)
+        if self.plan.count == 1:
+            return merged
+        # Vehicles on tile borders are found twice, all classes count as cars
+        return merged.with_nms(threshold=self.nms_threshold, class_agnostic=True)
+
+
+def measure_batch_latency(model, batch_size: int, tile_size: int, runs: int = 3) -> float:
+    tiles = [np.zeros((tile_size, tile_size, 3), dtype=np.uint8)] * batch_size
+    model(tiles, imgsz=tile_size, verbose=False)  # warmup
+    start = time.perf_counter()
+    for _ in range(runs):
+        model(tiles, imgsz=tile_size, verbose=False)
+    return (time.perf_counter() - start) / runs
+
+
+def select_tile_plan(model, width: int, height: int, target_fps: float = TARGET_FPS,
+                     tile_sizes: Sequence[int] = TILE_SIZES, overlap: float = TILE_OVERLAP,
+                     roi: Optional[Tuple[int, int, int, int]] = None) -> TilePlan:
+    """Pick the smallest tile size whose batch still reaches the target FPS."""
+    budget = 1.0 / target_fps
+    fastest = None
+    for tile_size in sorted(tile_sizes):
+        plan = make_tile_plan(width, height, tile_size, overlap, roi)
+        latency = measure_batch_latency(model, plan.count, tile_size)
+        logging.info(
+            f"Tile plan {tile_size}px x {plan.count}: {latency * 1000:.1f} ms "
+            f"({1.0 / latency:.1f} FPS)"
+        )
+        if latency <= budget:
+            return plan
+        if fastest is None or latency < fastest[0]:
+            fastest = (latency, plan)
+
+    logging.warning(f"No tile plan reaches {target_fps} FPS, using the fastest one")
+    return fastest[1]
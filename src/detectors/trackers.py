@@ -0,0 +1,151 @@
+from typing import Protocol
+
+import numpy as np
+import supervision as sv
+
+from ..config.settings import TRACKER_TYPE
+
+
+class Tracker(Protocol):
+    """Anything that assigns tracker_id values to detections frame by frame."""
+
+    def update_with_detections(self, detections: sv.Detections) -> sv.Detections:
+        ...
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes as an (N, M) matrix."""
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+class VectorizedTracker:
+    """IoU tracker with centroid fallback, kept entirely in NumPy arrays.
+
+    Association is a mutual-best match on an (tracks x detections) score
+    matrix, so the per-frame cost is O(N*M) array work without per-track
+    Python objects. Lost tracks coast on a constant velocity for up to
+    ``lost_track_buffer`` frames.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, centroid_threshold: float = 0.5,
+                 track_activation_threshold: float = 0.25, lost_track_buffer: int = 30,
+                 minimum_consecutive_frames: int = 1, max_match_rounds: int = 3):
+        self.iou_threshold = iou_threshold
+        self.centroid_threshold = centroid_threshold  # fraction of the track box diagonal
+        self.track_activation_threshold = track_activation_threshold
+        self.lost_track_buffer = lost_track_buffer
+        self.minimum_consecutive_frames = minimum_consecutive_frames
+        self.max_match_rounds = max_match_rounds
+        self.reset()
+
+    def reset(self):
+        self.boxes = np.empty((0, 4), dtype=np.float32)
+        self.velocities = np.empty((0, 2), dtype=np.float32)
+        self.ids = np.empty(0, dtype=int)
+        self.hits = np.empty(0, dtype=int)
+        self.missed = np.empty(0, dtype=int)
+        self.next_id = 1
+
+    def _scores(self, predicted: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        iou = box_iou(predicted, boxes)
+
+        # Fast or small vehicles may not overlap their previous box, fall back to
+        # centroid distance scaled into [0, iou_threshold) so IoU matches win
+        track_centers = (predicted[:, :2] + predicted[:, 2:]) / 2
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        distance = np.linalg.norm(track_centers[:, None, :] - centers[None, :, :], axis=2)
+        diagonal = np.linalg.norm(predicted[:, 2:] - predicted[:, :2], axis=1)[:, None]
+        closeness = 1 - distance / np.maximum(diagonal * self.centroid_threshold, 1e-9)
+        fallback = np.clip(closeness, 0, None) * self.iou_threshold * 0.99
+
+        scores = np.where(iou >= self.iou_threshold, iou, fallback)
+        scores[scores <= 0] = 0
+        return scores
+
+    def _match(self, scores: np.ndarray):
+        track_match = np.full(scores.shape[0], -1, dtype=int)
+        detection_match = np.full(scores.shape[1], -1, dtype=int)
+        scores = scores.copy()
+
+        for _ in range(self.max_match_rounds):
+            if scores.size == 0 or not scores.any():
+                break
+            best_detection = scores.argmax(axis=1)
+            best_track = scores.argmax(axis=0)
+            tracks = np.arange(scores.shape[0])
+            # A pair matches when each side is the other's best candidate
+            mutual = (best_track[best_detection] == tracks) & (scores[tracks, best_detection] > 0)
+            if not mutual.any():
+                break
+            matched_tracks = tracks[mutual]
+            matched_detections = best_detection[mutual]
+            track_match[matched_tracks] = matched_detections
+            detection_match[matched_detections] = matched_tracks
+            scores[matched_tracks, :] = 0
+            scores[:, matched_detections] = 0
+
+        return track_match, detection_match
+
+    def update_with_detections(self, detections: sv.Detections) -> sv.Detections:
+        boxes = detections.xyxy.astype(np.float32)
+        shift = np.tile(self.velocities, 2)
+        predicted = self.boxes + shift
+
+        track_match, detection_match = self._match(self._scores(predicted, boxes))
+        matched = track_match >= 0
+
+        # Matched tracks take the new box and blend in the observed motion
+        new_boxes = boxes[track_match[matched]]
+        motion = ((new_boxes[:, :2] + new_boxes[:, 2:]) - (self.boxes[matched, :2] + self.boxes[matched, 2:])) / 2
+        self.velocities[matched] = 0.5 * self.velocities[matched] + 0.5 * motion
+        self.boxes[matched] = new_boxes
+        self.hits[matched] += 1
+        self.missed[matched] = 0
+
+        # Unmatched tracks coast on their velocity until the buffer runs out
+        self.boxes[~matched] = predicted[~matched]
+        self.missed[~matched] += 1
+        keep = self.missed <= self.lost_track_buffer
+
+        # Confident unmatched detections start new tracks
+        confidence = detections.confidence if detections.confidence is not None else np.ones(len(detections))
+        new = (detection_match < 0) & (confidence >= self.track_activation_threshold)
+        new_ids = np.arange(self.next_id, self.next_id + new.sum())
+        self.next_id += len(new_ids)
+
+        # Map detections to track ids before compacting the state arrays
+        detection_ids = np.full(len(detections), -1, dtype=int)
+        detection_hits = np.zeros(len(detections), dtype=int)
+        detection_ids[track_match[matched]] = self.ids[matched]
+        detection_hits[track_match[matched]] = self.hits[matched]
+        detection_ids[new] = new_ids
+        detection_hits[new] = 1
+
+        self.boxes = np.concatenate([self.boxes[keep], boxes[new]])
+        self.velocities = np.concatenate([self.velocities[keep], np.zeros((len(new_ids), 2), dtype=np.float32)])
+        self.ids = np.concatenate([self.ids[keep], new_ids])
+        self.hits = np.concatenate([self.hits[keep], np.ones(len(new_ids), dtype=int)])
+        self.missed = np.concatenate([self.missed[keep], np.zeros(len(new_ids), dtype=int)])
+
+        confirmed = (detection_ids >= 0) & (detection_hits >= self.minimum_consecutive_frames)
+        tracked = detections[confirmed]
+        tracked.tracker_id = detection_ids[confirmed]
+        return tracked
+
+
+TRACKERS = {
+    "bytetrack": sv.ByteTrack,
+    "vectorized": VectorizedTracker,
+}
+
+
+def create_tracker(tracker_type: str = TRACKER_TYPE, **kwargs) -> Tracker:
+    if tracker_type not in TRACKERS:
+        raise ValueError(f"Unknown tracker type: {tracker_type}")
+    return TRACKERS[tracker_type](**kwargs)
@@ -1,43 +1,198 @@
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
 import numpy as np
 import supervision as sv
+import torch
 from ultralytics import YOLO
-import logging
-import cv2
-from supervision.tools.detections import Detections
-from supervision.tools.line_counter import LineCounter
-from supervision.draw.annotator import BoxAnnotator, LabelAnnotator
-from supervision.geometry import Point
-from ..config.settings import VEHICLE_CLASSES, MODEL_PATH
+
+from ..config.settings import (CONFIDENCE_THRESHOLD, FRAME_SKIP, INFERENCE_SIZE, LINE_POSITION,
+                               MODEL_PATH, MODEL_PRECISION, QUANTIZED_MODEL_PATH, ROI,
+                               TILED_INFERENCE, TRACKER_TYPE, VEHICLE_CLASSES)
+from ..utils.traffic_stats import TrafficStats
+from ..utils.video_reader import DecodedFrame, unletterbox_boxes
+from ..utils.visualization import Visualizer
+from .tiled_inference import TiledInference
+from .trackers import create_tracker
+
+
+class CrossingEvent(NamedTuple):
+    frame_index: int
+    direction: str  # "in" or "out"
+    count: int
+
+
+FrameSink = Callable[[np.ndarray], None]
+
+
+class ProcessingCancelled(Exception):
+    """Raised from a progress callback to stop processing early, it is not an error."""
+
+
+def load_model(precision: str = MODEL_PRECISION, model_path: Optional[Path] = None) -> YOLO:
+    if precision == "int8":
+        if not QUANTIZED_MODEL_PATH.exists():
+            raise FileNotFoundError(
+                f"INT8 model not found at {QUANTIZED_MODEL_PATH}. "
+                "Create it with: python -m src.detectors.quantization"
+            )
+        return YOLO(str(QUANTIZED_MODEL_PATH), task="detect")
+    if precision != "fp32":
+        raise ValueError(f"Unknown model precision: {precision}")
+    return YOLO(str(model_path or MODEL_PATH))
+
 
 class VehicleDetector:
-    def __init__(self, source_path: str, target_path: str):
-        self.source_path = source_path
-        self.target_path = target_path
-        self._init_model()
-        self._init_annotators()
-        self._init_video_info()
-        self._init_line_counter()
-        
-    def _init_model(self):
-        self.model = YOLO(MODEL_PATH)
-        
-    def _init_annotators(self):
-        self.box_annotator = BoxAnnotator(thickness=4)
-        self.label_annotator = LabelAnnotator(text_thickness=4, text_scale=2)
-        
-    def _init_video_info(self):
-        cap = cv2.VideoCapture(self.source_path)
-        if not cap.isOpened():
-            raise ValueError(f"Could not open video source: {self.source_path}")
-        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        self.fps = int(cap.get(cv2.CAP_PROP_FPS))
-        cap.release()
-        
-    def _init_line_counter(self):
-        self.line_counter = LineCounter(
-            start=Point(0, int(self.height * 0.7)),
-            end=Point(self.width, int(self.height * 0.7))
-        )
-
-    # Rest of the VehicleDetector implementation... 
\ No newline at end of file
+    """Streaming detection, tracking and line-counting engine.
+
+    ``stream`` consumes frames lazily and yields
+    ``(frame_index, tracked_detections, crossing_events)`` per frame. When
+    annotation is enabled, annotated frames are handed to the sinks, any
+    callables taking a BGR frame (a VideoSink's write_frame, a Qt signal's
+    emit, a shared frame ring's write).
+    """
+
+    def __init__(self, width: int, height: int, model: Optional[YOLO] = None,
+                 imgsz: int = INFERENCE_SIZE, confidence: float = CONFIDENCE_THRESHOLD,
+                 line_position: float = LINE_POSITION,
+                 vehicle_classes: Sequence[int] = VEHICLE_CLASSES,
+                 tracker: str = TRACKER_TYPE, tiled: bool = TILED_INFERENCE,
+                 frame_skip: int = FRAME_SKIP, roi: Optional[Tuple[int, int, int, int]] = ROI,
+                 annotate: bool = False, sinks: Sequence[FrameSink] = (),
+                 stats: Optional[TrafficStats] = None):
+        self.width = width
+        self.height = height
+        self.model = model if model is not None else load_model()
+        self.imgsz = imgsz
+        self.confidence = confidence
+        self.vehicle_classes = list(vehicle_classes)
+        self.frame_skip = frame_skip
+        self.roi = tuple(int(v) for v in roi) if roi is not None else None
+        self.annotate = annotate
+        self.sinks = list(sinks)
+        self.stats = stats
+
+        # Tiled inference for high-resolution sources
+        self.tiler = None
+        if tiled:
+            self.tiler = TiledInference.auto(
+                self.model, width, height, roi=self.roi,
+                vehicle_classes=self.vehicle_classes, confidence=confidence
+            )
+
+        # ByteTrack by default, vectorized IoU tracker for CPU-bound setups
+        self.object_tracker = create_tracker(tracker)
+
+        self.line_start = sv.Point(0, int(height * line_position))
+        self.line_end = sv.Point(width, int(height * line_position))
+        self.line_zone = sv.LineZone(start=self.line_start, end=self.line_end)
+        self.crossing_events: List[CrossingEvent] = []
+
+        self.trace_annotator = sv.TraceAnnotator(thickness=2, trace_length=30)
+        self.last_tracked = None
+
+    @property
+    def uses_tensor(self) -> bool:
+        # Tiled and ROI detection crop the full frame, a decode-stage tensor would go unused
+        return self.tiler is None and self.roi is None
+
+    @property
+    def in_count(self) -> int:
+        return self.line_zone.in_count
+
+    @property
+    def out_count(self) -> int:
+        return self.line_zone.out_count
+
+    def detect(self, frame: np.ndarray, decoded: Optional[DecodedFrame] = None) -> sv.Detections:
+        if self.tiler is not None:
+            # Tiles are cut from the full-resolution frame and merged with cross-tile NMS
+            return self.tiler.detect(frame)
+        if self.roi is not None:
+            # Only the region of interest goes through the model
+            x1, y1, x2, y2 = self.roi
+            results = self.model(frame[y1:y2, x1:x2], imgsz=self.imgsz, conf=self.confidence,
+                                 verbose=False)[0]
+            detections = sv.Detections.from_ultralytics(results)
+            detections.xyxy = detections.xyxy + np.array([x1, y1, x1, y1], dtype=detections.xyxy.dtype)
+        elif decoded is not None and decoded.tensor is not None:
+            # The decode stage already letterboxed the frame, so only inference runs here
+            tensor = torch.from_numpy(decoded.tensor).unsqueeze(0)
+            results = self.model(tensor, conf=self.confidence, verbose=False)[0]
+            detections = sv.Detections.from_ultralytics(results)
+            detections.xyxy = unletterbox_boxes(detections.xyxy, decoded.letterbox, frame.shape)
+        else:
+            results = self.model(frame, imgsz=self.imgsz, conf=self.confidence, verbose=False)[0]
+            detections = sv.Detections.from_ultralytics(results)
+
+        # All vehicle types are kept and labelled as cars
+        return detections[np.isin(detections.class_id, self.vehicle_classes)]
+
+    def _count_crossings(self, tracked: sv.Detections, frame_index: int) -> List[CrossingEvent]:
+        in_before, out_before = self.line_zone.in_count, self.line_zone.out_count
+        self.line_zone.trigger(detections=tracked)
+        events = []
+        if self.line_zone.in_count > in_before:
+            events.append(CrossingEvent(frame_index, "in", self.line_zone.in_count - in_before))
+        if self.line_zone.out_count > out_before:
+            events.append(CrossingEvent(frame_index, "out", self.line_zone.out_count - out_before))
+        self.crossing_events.extend(events)
+        return events
+
+    def update(self, frame: np.ndarray, frame_index: int,
+               decoded: Optional[DecodedFrame] = None) -> Tuple[sv.Detections, List[CrossingEvent]]:
+        if self.last_tracked is not None and frame_index % (self.frame_skip + 1) != 0:
+            # Skipped frame, reuse the last known tracks
+            tracked, events = self.last_tracked, []
+        else:
+            detections = self.detect(frame, decoded)
+            tracked = self.object_tracker.update_with_detections(detections)
+            self.last_tracked = tracked
+            events = self._count_crossings(tracked, frame_index)
+        if self.stats is not None:
+            # Every frame moves the time buckets forward, quiet minutes included
+            self.stats.record(frame_index, events)
+        return tracked, events
+
+    def annotate_frame(self, frame: np.ndarray, tracked: sv.Detections) -> np.ndarray:
+        annotated = self.trace_annotator.annotate(scene=frame.copy(), detections=tracked)
+        Visualizer.draw_detections(annotated, tracked)
+        Visualizer.draw_counting_line(annotated, self.line_start, self.line_end)
+        Visualizer.draw_count_overlay(annotated, self.in_count, self.out_count)
+        return annotated
+
+    def stream(self, frames: Iterable[Union[DecodedFrame, np.ndarray]],
+               sinks: Optional[Sequence[FrameSink]] = None
+               ) -> Iterator[Tuple[int, sv.Detections, List[CrossingEvent]]]:
+        """Lazily process frames, yielding (frame_index, tracked_detections, crossing_events).
+
+        Accepts DecodedFrame items from a FrameReader or plain BGR frames.
+        """
+        sinks = self.sinks + list(sinks or [])
+        for position, item in enumerate(frames):
+            if isinstance(item, DecodedFrame):
+                frame, frame_index, decoded = item.frame, item.index, item
+            else:
+                frame, frame_index, decoded = item, position, None
+
+            try:
+                tracked, events = self.update(frame, frame_index, decoded)
+                annotated = self.annotate_frame(frame, tracked) if self.annotate and sinks else frame
+            except Exception as e:
+                # A bad frame is passed through unannotated instead of ending the stream
+                logging.error(f"Error processing frame {frame_index}: {str(e)}")
+                tracked, events, annotated = sv.Detections.empty(), [], frame
+            for sink in sinks:
+                sink(annotated)
+            yield frame_index, tracked, events
+
+    def process_frame(self, frame: np.ndarray, frame_index: int,
+                      decoded: Optional[DecodedFrame] = None) -> np.ndarray:
+        """Update with one frame and return it annotated, or unchanged on errors."""
+        try:
+            tracked, _ = self.update(frame, frame_index, decoded)
+            return self.annotate_frame(frame, tracked)
+        except Exception as e:
+            logging.error(f"Error processing frame {frame_index}: {str(e)}")
+            return frame
@@ -1,19 +1,27 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFileDialog, QProgressBar,
                             QStatusBar, QGroupBox, QApplication)
-from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QObject, QTimer, QThread, pyqtSignal
 from PyQt6.QtGui import QImage, QPixmap
 import cv2
 import numpy as np
 from app_parking_management import VehicleTrackingSystem
+from src.server.job_client import JobClient
+from src.server.job_server import TERMINAL_STATUSES
+from src.config.settings import FRAME_RING_SLOTS, PREVIEW_SIZE, PROCESSING_MODE
+from src.interface.processing_worker import create_video_writer, run_processing_worker, run_tracking
+from src.interface.traffic_chart import TrafficChart
+from src.utils.frame_ring import SharedFrameRing
+import multiprocessing as mp
+import queue
 import os
 import time
-import sys
 
 class VideoProcessingThread(QThread):
     frame_processed = pyqtSignal(np.ndarray)
     progress_updated = pyqtSignal(int)
     counts_updated = pyqtSignal(dict)
+    stats_updated = pyqtSignal(dict)
     finished = pyqtSignal()
     error_occurred = pyqtSignal(str)
 
@@ -22,7 +30,8 @@ class VideoProcessingThread(QThread):
         self.source_path = source_path
         self.target_path = target_path
         self.is_running = True
-        self.tracker = VehicleTrackingSystem(source_path, target_path)
+        # Built in run(), loading the model (and auto-tuning on a first run) must not block the UI
+        self.tracker = None
         self.video_writer = None
         
         # Initialize counts
@@ -30,88 +39,224 @@ class VideoProcessingThread(QThread):
         self.out_count = 0
 
     def run(self):
+        reader = None
         try:
-            cap = cv2.VideoCapture(self.source_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video source")
-
-            # Get video properties
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-            # Initialize video writer with platform-specific codec
-            if sys.platform == 'darwin':  # macOS
-                fourcc = cv2.VideoWriter_fourcc(*'avc1')
-            else:  # Windows/Linux
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(self.target_path), exist_ok=True)
-
-            # Initialize video writer
-            self.video_writer = cv2.VideoWriter(
-                self.target_path,
-                fourcc,
-                fps,
-                (width, height)
-            )
-
-            if not self.video_writer.isOpened():
-                raise ValueError("Failed to initialize video writer")
+            self.tracker = VehicleTrackingSystem(self.source_path, self.target_path)
+            reader = self.tracker.create_reader()
 
-            frame_number = 0
-            while self.is_running and cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            self.video_writer = create_video_writer(self.target_path, reader.fps, (reader.width, reader.height))
 
-                # Process frame
-                processed_frame = self.tracker.process_frame(frame, frame_number)
-                
-                # Update counts
-                if hasattr(self.tracker, 'line_zone'):
-                    self.in_count = self.tracker.line_zone.in_count
-                    self.out_count = self.tracker.line_zone.out_count
-                    
-                    self.counts_updated.emit({
-                        'in': self.in_count,
-                        'out': self.out_count,
-                        'total': self.in_count + self.out_count
-                    })
-                
-                # Save frame
+            def save_frame(frame):
                 try:
                     if self.video_writer is not None and self.video_writer.isOpened():
-                        self.video_writer.write(processed_frame)
+                        self.video_writer.write(frame)
                 except Exception as e:
                     self.error_occurred.emit(f"Error saving frame: {str(e)}")
-                
-                # Emit frame for display
-                self.frame_processed.emit(processed_frame)
-                
-                frame_number += 1
-                progress = int((frame_number / total_frames) * 100)
-                self.progress_updated.emit(progress)
+
+            # Decoding and resizing happen on the reader thread, the engine saves and
+            # emits each annotated frame through its sinks
+            run_tracking(self.tracker, reader, [save_frame, self.frame_processed.emit],
+                         report=self.report, should_stop=lambda: not self.is_running)
 
         except Exception as e:
             self.error_occurred.emit(str(e))
         finally:
             # Clean up resources
-            if 'cap' in locals():
-                cap.release()
+            if reader is not None:
+                reader.close()
+            if self.tracker is not None:
+                self.tracker.save_stats()
             if self.video_writer is not None:
                 self.video_writer.release()
                 print(f"Video saved to: {self.target_path}")
             self.finished.emit()
 
+    def report(self, kind, payload):
+        if kind == 'counts':
+            self.in_count, self.out_count = payload['in'], payload['out']
+            self.counts_updated.emit(payload)
+        elif kind == 'stats':
+            self.stats_updated.emit(payload)
+        elif kind == 'progress':
+            self.progress_updated.emit(payload)
+
     def stop(self):
         self.is_running = False
         # Ensure video writer is properly closed
         if self.video_writer is not None:
             self.video_writer.release()
 
+class ProcessingProcess(QObject):
+    """Runs processing in a separate process and relays its output as Qt signals.
+
+    Preview frames arrive through a shared memory ring and everything else
+    through a control queue, both polled from the GUI event loop.
+    """
+    frame_processed = pyqtSignal(np.ndarray)
+    progress_updated = pyqtSignal(int)
+    counts_updated = pyqtSignal(dict)
+    stats_updated = pyqtSignal(dict)
+    finished = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, source_path, target_path):
+        super().__init__()
+        self.source_path = source_path
+        self.target_path = target_path
+        self.ctx = mp.get_context('spawn')
+        self.control = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.ring = None
+        self.process = None
+        self.last_sequence = 0
+        self.stop_deadline = None
+        self.done = False
+        self.poll_timer = QTimer()
+        self.poll_timer.timeout.connect(self.poll)
+
+    def start(self):
+        width, height = PREVIEW_SIZE
+        ring_shape = (FRAME_RING_SLOTS, height, width)
+        self.ring = SharedFrameRing.create(*ring_shape)
+        try:
+            self.process = self.ctx.Process(
+                target=run_processing_worker,
+                args=(self.source_path, self.target_path, self.ring.name, ring_shape,
+                      self.control, self.stop_event),
+                daemon=True
+            )
+            self.process.start()
+        except Exception:
+            self.cleanup()
+            raise
+        self.poll_timer.start(15)
+
+    def poll(self):
+        # Drain control messages first so the final counts land before 'finished'
+        self.drain_control()
+
+        if self.ring is not None:
+            latest = self.ring.read_latest(self.last_sequence)
+            if latest is not None:
+                self.last_sequence, frame = latest
+                self.frame_processed.emit(frame)
+
+        if self.process.is_alive():
+            if self.stop_deadline is not None and time.time() > self.stop_deadline:
+                # Worker ignored the stop request, do not let it hold the segment
+                self.process.terminate()
+            return
+
+        # The worker may have sent 'finished' and exited after the first drain
+        self.drain_control()
+        if not self.done and not self.stop_event.is_set() and self.process.exitcode != 0:
+            self.error_occurred.emit(f"Processing worker crashed (exit code {self.process.exitcode})")
+        self.cleanup()
+        self.finished.emit()
+
+    def drain_control(self):
+        while True:
+            try:
+                kind, payload = self.control.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'counts':
+                self.counts_updated.emit(payload)
+            elif kind == 'progress':
+                self.progress_updated.emit(payload)
+            elif kind == 'stats':
+                self.stats_updated.emit(payload)
+            elif kind == 'error':
+                self.error_occurred.emit(payload)
+            elif kind == 'finished':
+                self.done = True
+
+    def stop(self):
+        self.stop_event.set()
+        self.stop_deadline = time.time() + 5
+
+    def cleanup(self):
+        self.poll_timer.stop()
+        if self.process is not None:
+            self.process.join(timeout=1)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    def shutdown(self):
+        # Used when the window closes, wait briefly and never leave the segment behind
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.cleanup()
+
+class RemoteProcessingThread(QThread):
+    progress_updated = pyqtSignal(int)
+    counts_updated = pyqtSignal(dict)
+    stats_updated = pyqtSignal(dict)
+    status_changed = pyqtSignal(str)
+    finished = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, client, source_path, target_path):
+        super().__init__()
+        self.client = client
+        self.source_path = source_path
+        self.target_path = target_path
+        self.is_running = True
+        self.job_id = None
+        self.status = None
+        self.detach_reason = None
+
+    def run(self):
+        try:
+            job = self.client.submit(self.source_path, self.target_path)
+            self.job_id = job['id']
+
+            # Keeps following the job after Stop until the server confirms it ended
+            for event, job in self.client.stream_events(self.job_id, keepalives=True):
+                if not self.is_running:
+                    break
+                if job is None:
+                    continue
+                self.status = job['status']
+                self.progress_updated.emit(job['progress'])
+                self.counts_updated.emit(job['counts'])
+                if job.get('traffic'):
+                    self.stats_updated.emit(job['traffic'])
+                if job['status'] == 'failed':
+                    self.error_occurred.emit(job['error'] or "Job failed on server")
+
+            if self.status not in TERMINAL_STATUSES:
+                # Detached on purpose, or the server went away before the job ended
+                self.error_occurred.emit(
+                    self.detach_reason or f"Lost connection to the job server, job {self.job_id} did not finish"
+                )
+
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def stop(self):
+        if not self.is_running or self.job_id is None or self.status in TERMINAL_STATUSES:
+            return
+        try:
+            # Queued jobs are withdrawn, running ones stop at their next progress report
+            self.client.cancel(self.job_id)
+            self.status_changed.emit("Stopping job on server...")
+        except Exception as e:
+            self.detach(f"Could not stop job {self.job_id}, it keeps running on the server: {str(e)}")
+
+    def detach(self, reason: str):
+        # Stop following the job, it carries on on the server
+        self.detach_reason = reason
+        self.is_running = False
+        self.status_changed.emit(reason)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -165,6 +310,10 @@ class MainWindow(QMainWindow):
         """)
         self.setup_ui()
         self.video_thread = None
+        self.processing_active = False
+        self.stop_requested = False
+        self.last_error = None
+        self.job_client = JobClient()
         self.start_time = None
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_processing_time)
@@ -241,14 +390,17 @@ class MainWindow(QMainWindow):
         # Buttons
         self.select_file_btn = QPushButton("Select Video")
         self.start_btn = QPushButton("Start Processing")
+        self.submit_btn = QPushButton("Send to Server")
         self.stop_btn = QPushButton("Stop")
         
         self.select_file_btn.clicked.connect(self.select_video_file)
         self.start_btn.clicked.connect(self.start_processing)
+        self.submit_btn.clicked.connect(self.submit_to_server)
         self.stop_btn.clicked.connect(self.stop_processing)
         
         self.stop_btn.setEnabled(False)
         self.start_btn.setEnabled(False)
+        self.submit_btn.setEnabled(False)
         
         # Make buttons larger
         button_style = """
@@ -273,6 +425,7 @@ class MainWindow(QMainWindow):
         # Update button styles
         self.select_file_btn.setStyleSheet(button_style)
         self.start_btn.setStyleSheet(button_style)
+        self.submit_btn.setStyleSheet(button_style)
         self.stop_btn.setStyleSheet(button_style)
 
         # Ensure buttons are visible with proper spacing
@@ -280,6 +433,8 @@ class MainWindow(QMainWindow):
         controls_layout.addSpacing(20)  # Add space between buttons
         controls_layout.addWidget(self.start_btn)
         controls_layout.addSpacing(20)
+        controls_layout.addWidget(self.submit_btn)
+        controls_layout.addSpacing(20)
         controls_layout.addWidget(self.stop_btn)
         controls_layout.addStretch()
 
@@ -326,6 +481,28 @@ class MainWindow(QMainWindow):
         stats_layout.addWidget(self.out_count_label)
         stats_layout.addWidget(self.total_count_label)
 
+        # Live per-minute traffic chart
+        chart_frame = QGroupBox("Traffic per Minute")
+        chart_frame.setStyleSheet("""
+            QGroupBox {
+                border: 2px solid #444;
+                border-radius: 10px;
+                padding: 15px;
+                background-color: #1e1e1e;
+                color: white;
+                font-size: 14px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                left: 10px;
+                padding: 0 5px;
+            }
+        """)
+        chart_layout = QVBoxLayout(chart_frame)
+        
+        self.traffic_chart = TrafficChart()
+        chart_layout.addWidget(self.traffic_chart)
+
         # Progress section
         progress_frame = QGroupBox("Progress")
         progress_frame.setStyleSheet("""
@@ -353,6 +530,7 @@ class MainWindow(QMainWindow):
         layout.addWidget(video_frame)
         layout.addWidget(controls_frame)
         layout.addWidget(stats_frame)
+        layout.addWidget(chart_frame)
         layout.addWidget(progress_frame)
 
         # Status bar
@@ -393,7 +571,7 @@ class MainWindow(QMainWindow):
 
         # Adjust layout spacing
         layout.setSpacing(15)  # Increased spacing between elements
-        for frame in [video_frame, controls_frame, stats_frame, progress_frame]:
+        for frame in [video_frame, controls_frame, stats_frame, chart_frame, progress_frame]:
             frame.layout().setContentsMargins(15, 15, 15, 15)
             frame.layout().setSpacing(15)
 
@@ -420,13 +598,17 @@ class MainWindow(QMainWindow):
             os.makedirs(self.default_save_path, exist_ok=True)
             
             self.start_btn.setEnabled(True)
+            self.submit_btn.setEnabled(True)
             self.status_bar.showMessage(f"Selected: {file_name}")
             self.status_bar.showMessage(f"Output will be saved to: {self.target_path}")
 
     def start_processing(self):
         if hasattr(self, 'source_path'):
+            self.stop_requested = False
+            self.last_error = None
             try:
                 self.start_btn.setEnabled(False)
+                self.submit_btn.setEnabled(False)
                 self.stop_btn.setEnabled(True)
                 self.select_file_btn.setEnabled(False)
                 
@@ -435,15 +617,22 @@ class MainWindow(QMainWindow):
                 if not os.path.exists(output_dir):
                     os.makedirs(output_dir)
                 
-                # Initialize processing thread
-                self.video_thread = VideoProcessingThread(self.source_path, self.target_path)
+                self.traffic_chart.clear()
+                
+                # Initialize processing in a worker process, or a thread inside the GUI
+                if PROCESSING_MODE == 'process':
+                    self.video_thread = ProcessingProcess(self.source_path, self.target_path)
+                else:
+                    self.video_thread = VideoProcessingThread(self.source_path, self.target_path)
                 self.video_thread.frame_processed.connect(self.update_frame)
                 self.video_thread.progress_updated.connect(self.update_progress)
                 self.video_thread.counts_updated.connect(self.update_counts)
+                self.video_thread.stats_updated.connect(self.traffic_chart.set_data)
                 self.video_thread.error_occurred.connect(self.handle_error)
                 self.video_thread.finished.connect(self.processing_finished)
                 
                 self.video_thread.start()
+                self.processing_active = True
                 self.start_time = time.time()
                 self.timer.start(1000)
                 
@@ -452,13 +641,59 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 self.handle_error(f"Failed to start processing: {str(e)}")
 
+    def submit_to_server(self):
+        if not hasattr(self, 'source_path'):
+            return
+        if not self.job_client.is_available():
+            self.status_bar.showMessage(f"Job server not reachable at {self.job_client.base_url}")
+            return
+        self.stop_requested = False
+        self.last_error = None
+        try:
+            self.start_btn.setEnabled(False)
+            self.submit_btn.setEnabled(False)
+            self.stop_btn.setEnabled(True)
+            self.select_file_btn.setEnabled(False)
+
+            # The server renders the output video and saves the statistics, the GUI only
+            # follows progress, counts and the traffic chart
+            self.traffic_chart.clear()
+            self.video_thread = RemoteProcessingThread(self.job_client, self.source_path, self.target_path)
+            self.video_thread.progress_updated.connect(self.update_progress)
+            self.video_thread.counts_updated.connect(self.update_counts)
+            self.video_thread.stats_updated.connect(self.traffic_chart.set_data)
+            self.video_thread.status_changed.connect(self.status_bar.showMessage)
+            self.video_thread.error_occurred.connect(self.handle_error)
+            self.video_thread.finished.connect(self.processing_finished)
+
+            self.video_thread.start()
+            self.processing_active = True
+            self.start_time = time.time()
+            self.timer.start(1000)
+
+            self.status_bar.showMessage(f"Job sent to {self.job_client.base_url}. Output: {self.target_path}")
+
+        except Exception as e:
+            self.handle_error(f"Failed to submit job: {str(e)}")
+
     def stop_processing(self):
-        if self.video_thread:
-            self.video_thread.stop()
-            self.stop_btn.setEnabled(False)
-            self.start_btn.setEnabled(True)
-            self.select_file_btn.setEnabled(True)
-            self.status_bar.showMessage("Processing stopped. Partial results saved.")
+        if not self.processing_active:
+            # Nothing is running (starting failed), just bring the controls back
+            self.set_controls_idle()
+            return
+        # The controls come back on 'finished', until then the old run may still be
+        # shutting down and owns its worker process or shared memory segment
+        self.stop_requested = True
+        self.stop_btn.setEnabled(False)
+        self.video_thread.stop()
+        if self.last_error is None and not isinstance(self.video_thread, RemoteProcessingThread):
+            self.status_bar.showMessage("Stopping processing...")
+
+    def set_controls_idle(self):
+        self.stop_btn.setEnabled(False)
+        self.start_btn.setEnabled(True)
+        self.submit_btn.setEnabled(True)
+        self.select_file_btn.setEnabled(True)
 
     def update_frame(self, frame):
         try:
@@ -493,11 +728,14 @@ class MainWindow(QMainWindow):
 
     def processing_finished(self):
         self.timer.stop()
-        self.stop_btn.setEnabled(False)
-        self.start_btn.setEnabled(True)
-        self.select_file_btn.setEnabled(True)
+        self.processing_active = False
+        self.set_controls_idle()
         
-        if os.path.exists(self.target_path):
+        if self.last_error is not None:
+            self.status_bar.showMessage(f"Error: {self.last_error}")
+        elif self.stop_requested:
+            self.status_bar.showMessage("Processing stopped. Partial results saved.")
+        elif os.path.exists(self.target_path):
             file_size = os.path.getsize(self.target_path) / (1024 * 1024)  # Size in MB
             self.status_bar.showMessage(
                 f"Processing completed. Saved to: {self.target_path} (Size: {file_size:.1f} MB)"
@@ -506,6 +744,7 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Processing completed but file not saved successfully")
 
     def handle_error(self, error_message):
+        self.last_error = error_message
         self.status_bar.showMessage(f"Error: {error_message}")
         self.stop_processing()
 
@@ -514,6 +753,19 @@ class MainWindow(QMainWindow):
         self.out_count_label.setText(f"Cars OUT: {counts['out']}")
         self.total_count_label.setText(f"Total Cars: {counts['total']}")
 
+    def closeEvent(self, event):
+        if isinstance(self.video_thread, ProcessingProcess):
+            self.video_thread.shutdown()
+        elif isinstance(self.video_thread, RemoteProcessingThread) and self.video_thread.isRunning():
+            # The job carries on on the server, the thread returns at the next keepalive
+            self.video_thread.detach("Window closed, the job keeps running on the server")
+            self.video_thread.wait()
+        elif isinstance(self.video_thread, VideoProcessingThread) and self.video_thread.isRunning():
+            # A QThread destroyed while running aborts the application
+            self.video_thread.stop()
+            self.video_thread.wait()
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         if hasattr(self, 'video_display'):
@@ -0,0 +1,96 @@
+import logging
+import os
+import sys
+from typing import Callable
+
+import cv2
+
+from ..utils.frame_ring import SharedFrameRing
+
+
+def create_video_writer(target_path: str, fps: float, size: tuple) -> cv2.VideoWriter:
+    """Open the output video with the platform's codec, creating its folder."""
+    if sys.platform == 'darwin':  # macOS
+        fourcc = cv2.VideoWriter_fourcc(*'avc1')
+    else:  # Windows/Linux
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    video_writer = cv2.VideoWriter(target_path, fourcc, fps, size)
+    if not video_writer.isOpened():
+        raise ValueError("Failed to initialize video writer")
+    return video_writer
+
+
+def run_tracking(tracker, reader, sinks: list, report: Callable[[str, object], None],
+                 should_stop: Callable[[], bool]):
+    """Stream a clip through the tracker and report what changed after each frame.
+
+    ``report(kind, payload)`` receives 'counts', 'stats' and 'progress'
+    updates, so the caller only decides how they travel (Qt signals, a
+    process queue). Returns early when ``should_stop()`` turns true.
+    """
+    last_counts = None
+    last_progress = -1
+    last_stats = -1
+    for frame_number, _, _ in tracker.detector.stream(reader, sinks=sinks):
+        if should_stop():
+            break
+
+        in_count = tracker.line_zone.in_count
+        out_count = tracker.line_zone.out_count
+        if (in_count, out_count) != last_counts:
+            last_counts = (in_count, out_count)
+            report('counts', {'in': in_count, 'out': out_count, 'total': in_count + out_count})
+
+        # Chart snapshots only when a minute passes or a car crosses
+        if tracker.stats.revision != last_stats:
+            last_stats = tracker.stats.revision
+            report('stats', tracker.stats.chart_data())
+
+        if reader.total_frames > 0:
+            progress = int(((frame_number + 1) / reader.total_frames) * 100)
+            if progress != last_progress:
+                last_progress = progress
+                report('progress', progress)
+
+
+def run_processing_worker(source_path: str, target_path: str, ring_name: str, ring_shape: tuple,
+                          control, stop_event):
+    """Entry point of the processing process.
+
+    Annotated previews go into the shared frame ring; counts, traffic chart
+    snapshots, progress, errors and completion go over the control queue as
+    (kind, payload).
+    """
+    # Imported in the child so the GUI process stays free of the model and tracker
+    from app_parking_management import VehicleTrackingSystem
+
+    ring = SharedFrameRing.attach(ring_name, *ring_shape)
+    tracker = None
+    reader = None
+    video_writer = None
+    try:
+        tracker = VehicleTrackingSystem(source_path, target_path)
+        reader = tracker.create_reader()
+        video_writer = create_video_writer(target_path, reader.fps, (reader.width, reader.height))
+
+        # Only changes are reported, the control channel stays light
+        run_tracking(tracker, reader, [video_writer.write, ring.write],
+                     report=lambda kind, payload: control.put((kind, payload)),
+                     should_stop=stop_event.is_set)
+
+        control.put(('finished', target_path))
+
+    except Exception as e:
+        logging.error(f"Processing worker failed: {str(e)}")
+        control.put(('error', str(e)))
+    finally:
+        if reader is not None:
+            reader.close()
+        if video_writer is not None:
+            video_writer.release()
+        if tracker is not None:
+            tracker.save_stats()
+        # Only detach here, the GUI process owns and unlinks the segment
+        ring.close()
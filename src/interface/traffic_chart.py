@@ -0,0 +1,86 @@
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+
+
+class TrafficChart(QWidget):
+    """Live per-minute chart of IN/OUT crossings and net occupancy.
+
+    Draws whatever ``TrafficStats.chart_data`` last produced, so a redraw
+    never touches the processing history.
+    """
+
+    IN_COLOR = QColor("#20c997")
+    OUT_COLOR = QColor("#fd7e14")
+    OCCUPANCY_COLOR = QColor("#ffc107")
+    GRID_COLOR = QColor("#444")
+    TEXT_COLOR = QColor("white")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.data = None
+        self.setMinimumHeight(160)
+
+    def set_data(self, data: dict):
+        self.data = data
+        self.update()
+
+    def clear(self):
+        self.data = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("#212529"))
+
+        area = QRectF(self.rect()).adjusted(40, 25, -40, -25)
+        painter.setPen(QPen(self.GRID_COLOR, 1))
+        painter.drawLine(area.bottomLeft(), area.bottomRight())
+
+        if not self.data or not self.data['in']:
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(area, Qt.AlignmentFlag.AlignCenter, "No traffic data yet")
+            return
+
+        in_counts, out_counts, occupancy = self.data['in'], self.data['out'], self.data['occupancy']
+        minutes = len(in_counts)
+        max_flow = max(1, max(in_counts), max(out_counts))
+        low, high = min(0, min(occupancy)), max(1, max(occupancy))
+
+        # Paired IN/OUT bars per minute against the left axis
+        slot = area.width() / minutes
+        bar = max(1.0, slot * 0.4)
+        for i, (n_in, n_out) in enumerate(zip(in_counts, out_counts)):
+            x = area.left() + i * slot + (slot - 2 * bar) / 2
+            for offset, count, color in ((0, n_in, self.IN_COLOR), (bar, n_out, self.OUT_COLOR)):
+                height = area.height() * count / max_flow
+                painter.fillRect(QRectF(x + offset, area.bottom() - height, bar, height), color)
+
+        # Net occupancy as a line against the right axis
+        points = QPolygonF([
+            QPointF(area.left() + (i + 0.5) * slot,
+                    area.bottom() - area.height() * (value - low) / (high - low))
+            for i, value in enumerate(occupancy)
+        ])
+        painter.setPen(QPen(self.OCCUPANCY_COLOR, 2))
+        painter.drawPolyline(points)
+
+        painter.setPen(self.TEXT_COLOR)
+        painter.drawText(QRectF(0, area.top() - 5, 35, 15), Qt.AlignmentFlag.AlignRight, str(max_flow))
+        painter.drawText(QRectF(area.right() + 5, area.top() - 5, 35, 15), Qt.AlignmentFlag.AlignLeft,
+                         str(high))
+        start = self.data['start_minute']
+        painter.drawText(QRectF(area.left(), area.bottom() + 5, 80, 15), Qt.AlignmentFlag.AlignLeft,
+                         f"min {start}")
+        painter.drawText(QRectF(area.right() - 80, area.bottom() + 5, 80, 15), Qt.AlignmentFlag.AlignRight,
+                         f"min {start + minutes - 1}")
+
+        legend = [("IN / min", self.IN_COLOR), ("OUT / min", self.OUT_COLOR),
+                  ("Occupancy", self.OCCUPANCY_COLOR)]
+        x = area.left()
+        for label, color in legend:
+            painter.fillRect(QRectF(x, 6, 10, 10), color)
+            painter.setPen(self.TEXT_COLOR)
+            painter.drawText(QRectF(x + 14, 3, 90, 15), Qt.AlignmentFlag.AlignLeft, label)
+            x += 110
@@ -0,0 +1,75 @@
+import json
+import urllib.error
+import urllib.request
+from typing import Iterator, List, Optional, Tuple
+
+from ..config.settings import JOB_SERVER_HOST, JOB_SERVER_PORT
+
+
+class JobClient:
+    """Minimal client for the local job server."""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5.0):
+        self.base_url = (base_url or f"http://{JOB_SERVER_HOST}:{JOB_SERVER_PORT}").rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: Optional[dict] = None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", e.reason)
+            raise ValueError(f"Job server error: {message}") from e
+
+    def is_available(self) -> bool:
+        try:
+            self.list_jobs()
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def submit(self, source_path: str, target_path: Optional[str] = None) -> dict:
+        body = {"source_path": source_path}
+        if target_path is not None:
+            body["target_path"] = target_path
+        return self._request("POST", "/jobs", body)
+
+    def get_job(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def list_jobs(self) -> List[dict]:
+        return self._request("GET", "/jobs")
+
+    def cancel(self, job_id: str) -> dict:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def stream_events(self, job_id: str, read_timeout: float = 30.0,
+                      keepalives: bool = False) -> Iterator[Tuple[str, Optional[dict]]]:
+        """Yield (event, job_state) pairs until the job reaches a final state.
+
+        The server sends a keepalive every few seconds, so a read that waits
+        longer than ``read_timeout`` means it is gone. With ``keepalives``
+        those are yielded as ("keepalive", None), letting the consumer check
+        its own state while the job is quiet.
+        """
+        response = urllib.request.urlopen(f"{self.base_url}/jobs/{job_id}/events", timeout=read_timeout)
+        with response:
+            event, data = "message", []
+            for raw_line in response:
+                line = raw_line.decode().rstrip("\r\n")
+                if line.startswith(":"):
+                    if keepalives:
+                        yield "keepalive", None
+                elif not line:
+                    if data:
+                        yield event, json.loads("\n".join(data))
+                    event, data = "message", []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].strip())
@@ -0,0 +1,425 @@
+"""Local job server that queues videos for a pool of warm worker processes.
+
+Usage (from the project root):
+    python -m src.server.job_server [--host HOST] [--port PORT] [--workers N]
+
+Endpoints:
+    POST   /jobs              {"source_path": ..., "target_path": optional}
+    GET    /jobs              list all jobs
+    GET    /jobs/<id>         job state
+    GET    /jobs/<id>/events  server-sent events with progress and counts
+    DELETE /jobs/<id>         cancel a queued job, or stop a running one
+"""
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ..config.settings import (JOB_SERVER_HOST, JOB_SERVER_PORT,
+                               JOB_SERVER_WORKERS, OUTPUT_DIR)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+SSE_KEEPALIVE_SECONDS = 5  # idle event streams get a comment line this often
+MAX_STARTUP_FAILURES = 3  # consecutive failed starts before a worker slot is given up
+
+
+def _worker_main(worker_id: int, tasks: mp.Queue, events: mp.Queue, cancel_job):
+    # Imported here so the server process itself never loads torch or the model
+    try:
+        from app_parking_management import VehicleTrackingSystem
+        from ..detectors.vehicle_detector import ProcessingCancelled, load_model
+
+        model = load_model()
+    except Exception as e:
+        logging.error(f"Worker {worker_id} failed to start: {str(e)}")
+        events.put((None, "worker_failed", {"worker": worker_id, "error": str(e)}))
+        return
+    events.put((None, "worker_ready", {"worker": worker_id}))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, source_path, target_path = task
+        events.put((job_id, "started", {"worker": worker_id}))
+        try:
+            tracker = VehicleTrackingSystem(source_path, target_path, model=model)
+            last_progress = -1
+
+            def report(frame_number: int, total_frames: int):
+                nonlocal last_progress
+                # The id of the job to stop, so a late cancel never hits the next job
+                if cancel_job.value.decode() == job_id:
+                    raise ProcessingCancelled()
+                progress = int(frame_number / total_frames * 100) if total_frames else 0
+                # One event per percent keeps the queue light on long videos
+                if progress != last_progress:
+                    last_progress = progress
+                    events.put((job_id, "progress", {
+                        "progress": progress,
+                        "frame": frame_number,
+                        "counts": _counts(tracker),
+                        "traffic": tracker.stats.chart_data(),
+                    }))
+
+            tracker.process_video(progress_callback=report)
+            events.put((job_id, "completed", {
+                "worker": worker_id,
+                "progress": 100,
+                "counts": _counts(tracker),
+                "traffic": tracker.stats.chart_data(),
+                "stats_path": str(tracker.stats_path),
+            }))
+        except ProcessingCancelled:
+            # The partial output video and statistics are kept
+            logging.info(f"Job {job_id} cancelled")
+            events.put((job_id, "cancelled", {"worker": worker_id, "counts": _counts(tracker)}))
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {str(e)}")
+            events.put((job_id, "failed", {"worker": worker_id, "error": str(e)}))
+
+
+def _counts(tracker) -> dict:
+    in_count = tracker.line_zone.in_count
+    out_count = tracker.line_zone.out_count
+    return {"in": in_count, "out": out_count, "total": in_count + out_count}
+
+
+class JobManager:
+    """Keeps job state, feeds the worker pool and fans events out to subscribers."""
+
+    def __init__(self, workers: int = JOB_SERVER_WORKERS):
+        ctx = mp.get_context("spawn")
+        self.events = ctx.Queue()
+        self.jobs: Dict[str, dict] = {}
+        # Jobs wait here until a worker is idle, so queued jobs can still be cancelled
+        self.pending = deque()
+        self.idle_workers: Set[int] = set()
+        self.assigned: Dict[int, str] = {}  # worker index -> job id handed to it
+        self.ready_workers: Set[int] = set()
+        self.startup_failures: Dict[int, int] = {}  # worker index -> exits before becoming ready
+        self.startup_error: Optional[str] = None
+        self.subscribers: Dict[str, List[queue.Queue]] = {}
+        self.lock = threading.Lock()
+        self.ctx = ctx
+        self.closing = False
+        # One task queue per worker, so the manager always knows which job a worker holds
+        self.task_queues: List[mp.Queue] = [None] * workers
+        self.cancel_jobs = [None] * workers  # shared job id a worker should stop
+        self.workers = [self._start_worker(i) for i in range(workers)]
+        self.dispatcher = threading.Thread(target=self._dispatch_events, daemon=True)
+        self.dispatcher.start()
+
+    def _start_worker(self, worker_id: int) -> mp.Process:
+        # A fresh queue, a task left in the old one belonged to the crashed worker
+        self.task_queues[worker_id] = self.ctx.Queue()
+        self.cancel_jobs[worker_id] = self.ctx.Array("c", 32)
+        worker = self.ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.task_queues[worker_id], self.events, self.cancel_jobs[worker_id]),
+            daemon=True
+        )
+        worker.start()
+        return worker
+
+    def _check_workers(self):
+        # Replace crashed workers and fail the job they were holding
+        if self.closing:
+            return
+        for worker_id, worker in enumerate(self.workers):
+            if worker is None or worker.is_alive() or worker.exitcode is None:
+                continue
+            if worker_id not in self.ready_workers:
+                # Died while loading the model, reported or not
+                self.startup_failures[worker_id] = self.startup_failures.get(worker_id, 0) + 1
+            self.ready_workers.discard(worker_id)
+            with self.lock:
+                self.idle_workers.discard(worker_id)
+                job_id = self.assigned.pop(worker_id, None)
+            if job_id is not None:
+                self._handle_event(job_id, "failed", {"error": f"Worker crashed (exit code {worker.exitcode})"})
+
+            if self.startup_failures.get(worker_id, 0) >= MAX_STARTUP_FAILURES:
+                logging.error(f"Worker {worker_id} failed to start {MAX_STARTUP_FAILURES} times, giving up")
+                self.workers[worker_id] = None
+                if all(w is None for w in self.workers):
+                    self._fail_pending(f"No worker could start: {self.startup_error}")
+                continue
+            logging.error(f"Worker {worker_id} exited with code {worker.exitcode}, restarting")
+            self.workers[worker_id] = self._start_worker(worker_id)
+
+    def _fail_pending(self, error: str):
+        with self.lock:
+            job_ids = [job_id for job_id in self.pending if self.jobs[job_id]["status"] == "queued"]
+            self.pending.clear()
+        for job_id in job_ids:
+            self._handle_event(job_id, "failed", {"error": error})
+
+    def submit(self, source_path: str, target_path: Optional[str] = None) -> dict:
+        if all(w is None for w in self.workers):
+            raise RuntimeError(f"No worker could start: {self.startup_error}")
+        if not Path(source_path).is_file():
+            raise ValueError(f"Video not found: {source_path}")
+        if target_path is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            target_path = str(OUTPUT_DIR / f"{Path(source_path).stem}_processed_{timestamp}.mp4")
+
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "source_path": source_path,
+            "target_path": target_path,
+            "status": "queued",
+            "progress": 0,
+            "counts": {"in": 0, "out": 0, "total": 0},
+            "traffic": None,
+            "stats_path": None,
+            "error": None,
+            "created": time.time(),
+        }
+        with self.lock:
+            self.jobs[job["id"]] = job
+            self.pending.append(job["id"])
+            self._feed_workers()
+        logging.info(f"Queued job {job['id']}: {source_path}")
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def list(self) -> List[dict]:
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def cancel(self, job_id: str) -> bool:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                return False
+            if job["status"] != "queued":
+                # Running jobs stop at their next progress report, the worker confirms with "cancelled"
+                for worker_id, assigned_job in self.assigned.items():
+                    if assigned_job == job_id:
+                        self.cancel_jobs[worker_id].value = job_id.encode()
+                job["status"] = "cancelling"
+            else:
+                job["status"] = "cancelled"
+            data = dict(job)
+        self._publish(job_id, job["status"], data)
+        return True
+
+    def subscribe(self, job_id: str) -> queue.Queue:
+        events = queue.Queue()
+        with self.lock:
+            self.subscribers.setdefault(job_id, []).append(events)
+        return events
+
+    def unsubscribe(self, job_id: str, events: queue.Queue):
+        with self.lock:
+            if events in self.subscribers.get(job_id, []):
+                self.subscribers[job_id].remove(events)
+
+    def _feed_workers(self):
+        # Called with the lock held
+        while self.idle_workers and self.pending:
+            job = self.jobs[self.pending.popleft()]
+            if job["status"] != "queued":
+                continue
+            worker_id = self.idle_workers.pop()
+            self.task_queues[worker_id].put((job["id"], job["source_path"], job["target_path"]))
+            self.assigned[worker_id] = job["id"]
+            job["status"] = "assigned"
+
+    def _publish(self, job_id: str, event: str, data: dict):
+        with self.lock:
+            subscribers = list(self.subscribers.get(job_id, []))
+        for events in subscribers:
+            events.put((event, data))
+
+    def _dispatch_events(self):
+        last_check = time.time()
+        while True:
+            # Busy workers keep the queue full, so crashes are also checked between events
+            if time.time() - last_check >= 1:
+                self._check_workers()
+                last_check = time.time()
+            try:
+                job_id, event, payload = self.events.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            if event == "worker_ready":
+                logging.info(f"Worker {payload['worker']} ready")
+                self.ready_workers.add(payload["worker"])
+                self.startup_failures[payload["worker"]] = 0
+                with self.lock:
+                    self.idle_workers.add(payload["worker"])
+                    self._feed_workers()
+                continue
+            if event == "worker_failed":
+                self.startup_error = payload["error"]
+                continue
+            if event in ("completed", "failed", "cancelled"):
+                with self.lock:
+                    self.assigned.pop(payload["worker"], None)
+                    self.idle_workers.add(payload["worker"])
+                    self._feed_workers()
+            self._handle_event(job_id, event, payload)
+
+    def _handle_event(self, job_id: str, event: str, payload: dict):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            if event == "started":
+                # A cancel can arrive before the worker picked the job up
+                job["status"] = "cancelling" if job["status"] == "cancelling" else "running"
+            elif event in ("completed", "failed", "cancelled"):
+                job["status"] = event
+            job["progress"] = payload.get("progress", job["progress"])
+            job["counts"] = payload.get("counts", job["counts"])
+            job["traffic"] = payload.get("traffic", job["traffic"])
+            job["stats_path"] = payload.get("stats_path", job["stats_path"])
+            job["error"] = payload.get("error", job["error"])
+            data = dict(job)
+        self._publish(job_id, event, data)
+
+    def shutdown(self):
+        self.closing = True
+        for worker, tasks in zip(self.workers, self.task_queues):
+            if worker is not None:
+                tasks.put(None)
+        for worker in self.workers:
+            if worker is None:
+                continue
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    manager: JobManager = None
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+    def _send_json(self, status: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _path_parts(self) -> List[str]:
+        return [part for part in self.path.split("?")[0].split("/") if part]
+
+    def do_POST(self):
+        if self._path_parts() != ["jobs"]:
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            job = self.manager.submit(body["source_path"], body.get("target_path"))
+        except KeyError:
+            return self._send_json(400, {"error": "source_path is required"})
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        except RuntimeError as e:
+            return self._send_json(503, {"error": str(e)})
+        self._send_json(201, job)
+
+    def do_GET(self):
+        parts = self._path_parts()
+        if parts == ["jobs"]:
+            return self._send_json(200, self.manager.list())
+        if len(parts) == 2 and parts[0] == "jobs":
+            job = self.manager.get(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "Unknown job"})
+            return self._send_json(200, job)
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            return self._stream_events(parts[1])
+        self._send_json(404, {"error": "Not found"})
+
+    def do_DELETE(self):
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != "jobs":
+            return self._send_json(404, {"error": "Not found"})
+        if not self.manager.cancel(parts[1]):
+            return self._send_json(409, {"error": "Job already finished"})
+        self._send_json(200, self.manager.get(parts[1]))
+
+    def _write_event(self, event: str, data: dict):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream_events(self, job_id: str):
+        # Subscribe before reading the state so no event falls in between
+        events = self.manager.subscribe(job_id)
+        try:
+            job = self.manager.get(job_id)
+            if job is None:
+                return self._send_json(404, {"error": "Unknown job"})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            self._write_event("state", job)
+            status = job["status"]
+            while status not in TERMINAL_STATUSES:
+                try:
+                    event, data = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps idle connections alive
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+                self._write_event(event, data)
+                status = data["status"]
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.manager.unsubscribe(job_id, events)
+
+
+def serve(host: str = JOB_SERVER_HOST, port: int = JOB_SERVER_PORT,
+          workers: int = JOB_SERVER_WORKERS):
+    manager = JobManager(workers)
+    handler = type("BoundJobRequestHandler", (JobRequestHandler,), {"manager": manager})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logging.info(f"Job server listening on http://{host}:{port} with {workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vehicle tracking job server")
+    parser.add_argument("--host", default=JOB_SERVER_HOST)
+    parser.add_argument("--port", type=int, default=JOB_SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=JOB_SERVER_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.settings import FRAME_CACHE_DIR, FRAME_CACHE_MAX_BYTES, FRAME_CACHE_SCALE
+
+
+class ClipTooLarge(Exception):
+    """Raised by FrameCache.build for clips that would not fit in ``max_bytes``."""
+
+
+class CachedClip(NamedTuple):
+    frames: np.memmap  # (frames, height, width, 3) uint8 BGR, read-only
+    fps: float
+
+    @property
+    def width(self) -> int:
+        return self.frames.shape[2]
+
+    @property
+    def height(self) -> int:
+        return self.frames.shape[1]
+
+
+def scaled_size(width: int, height: int, scale: float = FRAME_CACHE_SCALE) -> Tuple[int, int]:
+    if scale >= 1.0:
+        return width, height
+    return int(round(width * scale)), int(round(height * scale))
+
+
+class FrameCache:
+    """Decoded clips stored as raw memory-mapped frame files.
+
+    The first request for a clip decodes it once; later runs map the file
+    and read frames straight from the page cache. Each clip has a JSON
+    sidecar with its shape and last use, which drives LRU eviction to keep
+    the cache within ``max_bytes``. Clips larger than that are not cached,
+    ``fits`` tells callers to decode them normally instead.
+    """
+
+    def __init__(self, cache_dir: Path = FRAME_CACHE_DIR, max_bytes: int = FRAME_CACHE_MAX_BYTES,
+                 scale: float = FRAME_CACHE_SCALE):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.scale = scale
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, source_path: str) -> str:
+        # Size and mtime invalidate the entry when the clip is replaced
+        stat = os.stat(source_path)
+        identity = f"{os.path.abspath(source_path)}|{stat.st_size}|{stat.st_mtime_ns}|{self.scale}"
+        return hashlib.sha1(identity.encode()).hexdigest()[:16]
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.cache_dir / f"{key}.raw", self.cache_dir / f"{key}.json"
+
+    def _clip_size(self, cap: cv2.VideoCapture) -> Tuple[int, int, int]:
+        """Scaled width and height and the expected raw size, 0 when the frame count is unknown."""
+        width, height = scaled_size(
+            int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), self.scale
+        )
+        return width, height, max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT))) * width * height * 3
+
+    def fits(self, source_path: str) -> bool:
+        """Whether the clip is cached or small enough to be, checked before any decoding."""
+        raw_path, meta_path = self._paths(self.key(source_path))
+        if raw_path.exists() and meta_path.exists():
+            return True
+        cap = cv2.VideoCapture(source_path)
+        try:
+            return cap.isOpened() and 0 < self._clip_size(cap)[2] <= self.max_bytes
+        finally:
+            cap.release()
+
+    def _write_meta(self, meta_path: Path, meta: dict):
+        # Atomic, other processes reading the sidecar never see a half-written file
+        tmp_path = meta_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, meta_path)
+
+    def get(self, source_path: str) -> Optional[CachedClip]:
+        raw_path, meta_path = self._paths(self.key(source_path))
+        if not (raw_path.exists() and meta_path.exists()):
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            logging.warning(f"Unreadable frame cache entry {meta_path}, rebuilding it")
+            return None
+        meta["last_used"] = time.time()
+        self._write_meta(meta_path, meta)
+        frames = np.memmap(raw_path, dtype=np.uint8, mode="r",
+                           shape=(meta["frames"], meta["height"], meta["width"], 3))
+        return CachedClip(frames, meta["fps"])
+
+    def build(self, source_path: str) -> CachedClip:
+        key = self.key(source_path)
+        raw_path, meta_path = self._paths(key)
+        tmp_path = raw_path.with_suffix(f".{os.getpid()}.tmp")
+
+        cap = cv2.VideoCapture(source_path)
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video source: {source_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width, height, estimate = self._clip_size(cap)
+        if not 0 < estimate <= self.max_bytes:
+            cap.release()
+            raise ClipTooLarge(
+                f"{source_path} needs {estimate / 1024 ** 2:.0f} MB, over the frame cache limit"
+                if estimate else f"{source_path} reports no frame count, its cached size is unknown"
+            )
+        # Room is made before writing, the cache never holds more than max_bytes at once
+        self.evict(reserve=estimate)
+
+        count = 0
+        frame_bytes = width * height * 3
+        try:
+            with open(tmp_path, "wb") as f:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    # Frame counts are container metadata, stop if the clip turns out larger
+                    if (count + 1) * frame_bytes > self.max_bytes:
+                        raise ClipTooLarge(f"{source_path} grew over the frame cache limit while decoding")
+                    if frame.shape[1] != width or frame.shape[0] != height:
+                        frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+                    f.write(frame.tobytes())
+                    count += 1
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            cap.release()
+
+        if count == 0:
+            tmp_path.unlink(missing_ok=True)
+            raise ValueError(f"No frames could be decoded from {source_path}")
+        os.replace(tmp_path, raw_path)
+        meta = {
+            "source": os.path.abspath(source_path),
+            "frames": count,
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "bytes": raw_path.stat().st_size,
+            "last_used": time.time(),
+        }
+        self._write_meta(meta_path, meta)
+        logging.info(f"Cached {count} frames of {source_path} ({meta['bytes'] / 1024 ** 2:.0f} MB)")
+
+        self.evict(keep=key)
+        return self.get(source_path)
+
+    def open(self, source_path: str) -> CachedClip:
+        clip = self.get(source_path)
+        return clip if clip is not None else self.build(source_path)
+
+    def evict(self, keep: Optional[str] = None, reserve: int = 0):
+        """Drop least recently used clips until the cache, plus ``reserve`` bytes, fits."""
+        entries = []
+        for meta_path in self.cache_dir.glob("*.json"):
+            try:
+                meta = json.loads(meta_path.read_text())
+            except (OSError, json.JSONDecodeError):
+                continue
+            entries.append((meta["last_used"], meta["bytes"], meta_path.stem))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total + reserve <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            raw_path, meta_path = self._paths(key)
+            raw_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            total -= size
+            logging.info(f"Evicted cached clip {key} ({size / 1024 ** 2:.0f} MB)")
@@ -0,0 +1,90 @@
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Per-slot header: sequence number, frame height, frame width
+SLOT_FIELDS = 3
+
+
+class SharedFrameRing:
+    """Fixed-size ring of BGR frames in one shared memory segment.
+
+    One process writes, another reads the newest frame. Each slot carries
+    the sequence number of the frame it holds; the writer clears it while
+    copying and the reader checks it again after copying, so torn frames
+    are dropped instead of displayed.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, height: int, width: int,
+                 owner: bool):
+        self.shm = shm
+        self.slots = slots
+        self.height = height
+        self.width = width
+        self.owner = owner
+
+        header_size = (1 + slots * SLOT_FIELDS) * 8
+        self.latest = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self.header = np.ndarray((slots, SLOT_FIELDS), dtype=np.int64, buffer=shm.buf, offset=8)
+        self.frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=shm.buf,
+                                 offset=header_size)
+
+    @staticmethod
+    def segment_size(slots: int, height: int, width: int) -> int:
+        return (1 + slots * SLOT_FIELDS) * 8 + slots * height * width * 3
+
+    @classmethod
+    def create(cls, slots: int, height: int, width: int) -> "SharedFrameRing":
+        shm = shared_memory.SharedMemory(create=True, size=cls.segment_size(slots, height, width))
+        ring = cls(shm, slots, height, width, owner=True)
+        ring.latest[0] = 0
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, slots: int, height: int, width: int) -> "SharedFrameRing":
+        return cls(shared_memory.SharedMemory(name=name), slots, height, width, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, frame: np.ndarray) -> int:
+        # Downscale into the slot keeping the aspect ratio, previews never need more
+        height, width = frame.shape[:2]
+        scale = min(self.height / height, self.width / width, 1.0)
+        if scale < 1.0:
+            width, height = int(width * scale), int(height * scale)
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+        sequence = int(self.latest[0]) + 1
+        slot = sequence % self.slots
+        self.header[slot, 0] = -1
+        self.frames[slot, :height, :width] = frame
+        self.header[slot, 1:] = (height, width)
+        self.header[slot, 0] = sequence
+        self.latest[0] = sequence
+        return sequence
+
+    def read_latest(self, last_sequence: int = 0) -> Optional[Tuple[int, np.ndarray]]:
+        """Return (sequence, frame copy) if a frame newer than last_sequence exists."""
+        sequence = int(self.latest[0])
+        if sequence <= last_sequence:
+            return None
+        slot = sequence % self.slots
+        height, width = (int(v) for v in self.header[slot, 1:])
+        frame = self.frames[slot, :height, :width].copy()
+        if int(self.header[slot, 0]) != sequence:
+            return None  # overwritten while copying
+        return sequence, frame
+
+    def close(self):
+        # Drop the array views first, the buffer cannot be released while they exist
+        self.latest = self.header = self.frames = None
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,63 @@
+from typing import NamedTuple, Sequence, Tuple
+
+import numpy as np
+import supervision as sv
+
+
+class MatchResult(NamedTuple):
+    matched: int
+    precision: float
+    recall: float
+
+    @property
+    def f1(self) -> float:
+        if self.precision + self.recall == 0:
+            return 0.0
+        return 2 * self.precision * self.recall / (self.precision + self.recall)
+
+
+def match_boxes(reference: np.ndarray, candidate: np.ndarray, iou_threshold: float = 0.5) -> MatchResult:
+    """Greedily match candidate boxes against reference boxes by IoU."""
+    if len(reference) == 0 or len(candidate) == 0:
+        matched = 0
+    else:
+        iou = sv.box_iou_batch(reference, candidate)
+        used_reference = np.zeros(len(reference), dtype=bool)
+        used_candidate = np.zeros(len(candidate), dtype=bool)
+        matched = 0
+        # Highest IoU pairs first, each box is used at most once
+        for flat in np.argsort(iou, axis=None)[::-1]:
+            r, c = np.unravel_index(flat, iou.shape)
+            if iou[r, c] < iou_threshold:
+                break
+            if used_reference[r] or used_candidate[c]:
+                continue
+            used_reference[r] = used_candidate[c] = True
+            matched += 1
+
+    precision = matched / len(candidate) if len(candidate) else 1.0
+    recall = matched / len(reference) if len(reference) else 1.0
+    return MatchResult(matched, precision, recall)
+
+
+def match_events(reference: Sequence[float], candidate: Sequence[float],
+                 tolerance: float) -> Tuple[int, float]:
+    """Match event timestamps in order within a tolerance.
+
+    Returns the number of matched events and their mean absolute offset.
+    """
+    reference, candidate = sorted(reference), sorted(candidate)
+    i = j = matched = 0
+    offsets = []
+    while i < len(reference) and j < len(candidate):
+        offset = candidate[j] - reference[i]
+        if abs(offset) <= tolerance:
+            offsets.append(abs(offset))
+            matched += 1
+            i += 1
+            j += 1
+        elif offset < 0:
+            j += 1
+        else:
+            i += 1
+    return matched, float(np.mean(offsets)) if offsets else 0.0
@@ -0,0 +1,208 @@
+import hashlib
+import logging
+import math
+import os
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+from ..config.settings import (STATS_CHART_MINUTES, STATS_DIR, STATS_HOUR_BUCKETS,
+                               STATS_MINUTE_BUCKETS)
+
+
+class TrafficSummary(NamedTuple):
+    start: float  # seconds, snapped to the bucket boundaries that were used
+    end: float
+    in_count: int
+    out_count: int
+    occupancy: int  # net vehicles inside at the end of the range
+    peak_per_minute: int  # busiest minute (IN + OUT) inside the range
+
+
+class BucketRing:
+    """Fixed-size ring of per-bucket IN/OUT counts with running totals.
+
+    ``cum_in`` and ``cum_out`` hold the totals up to and including each
+    bucket, so counts over any range still in the ring take one
+    subtraction. ``peak`` is the busiest minute (IN + OUT) of each bucket.
+    """
+
+    FIELDS = ("in_counts", "out_counts", "cum_in", "cum_out", "peak")
+
+    def __init__(self, bucket_seconds: int, size: int):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.newest = -1  # absolute index of the newest bucket, -1 before the first one
+        for name in self.FIELDS:
+            setattr(self, name, np.zeros(size, dtype=np.int64))
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self.newest - self.size + 1)
+
+    def bucket(self, seconds: float) -> int:
+        return int(seconds // self.bucket_seconds)
+
+    def advance(self, bucket: int):
+        if bucket <= self.newest:
+            return
+        last = self.newest % self.size
+        last_in = self.cum_in[last] if self.newest >= 0 else 0
+        last_out = self.cum_out[last] if self.newest >= 0 else 0
+
+        # Quiet buckets carry the running totals forward, at most one lap of the ring
+        slots = np.arange(max(self.newest + 1, bucket - self.size + 1), bucket + 1) % self.size
+        self.in_counts[slots] = 0
+        self.out_counts[slots] = 0
+        self.peak[slots] = 0
+        self.cum_in[slots] = last_in
+        self.cum_out[slots] = last_out
+        self.newest = bucket
+
+    def add(self, bucket: int, direction: str, count: int, minute_total: int):
+        self.advance(bucket)
+        # Late events land in the newest bucket so the running totals stay monotonic
+        slot = self.newest % self.size
+        if direction == "in":
+            self.in_counts[slot] += count
+            self.cum_in[slot] += count
+        else:
+            self.out_counts[slot] += count
+            self.cum_out[slot] += count
+        self.peak[slot] = max(self.peak[slot], minute_total)
+
+    def clamp(self, first: int, last: int) -> Tuple[int, int]:
+        return max(first, self.oldest), min(last, self.newest)
+
+    def totals(self, first: int, last: int) -> Tuple[int, int]:
+        """IN and OUT counts over buckets first..last, in constant time."""
+        first, last = self.clamp(first, last)
+        if self.newest < 0 or last < first:
+            return 0, 0
+        head, tail = first % self.size, last % self.size
+        # Totals before ``first`` are recovered from the bucket itself, it may be the oldest one
+        in_count = self.cum_in[tail] - (self.cum_in[head] - self.in_counts[head])
+        out_count = self.cum_out[tail] - (self.cum_out[head] - self.out_counts[head])
+        return int(in_count), int(out_count)
+
+    def slots(self, first: int, last: int) -> np.ndarray:
+        first, last = self.clamp(first, last)
+        return np.arange(first, last + 1) % self.size
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {f"{prefix}_{name}": getattr(self, name) for name in self.FIELDS}
+        arrays[f"{prefix}_newest"] = np.array(self.newest)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str, bucket_seconds: int) -> "BucketRing":
+        ring = cls(bucket_seconds, len(arrays[f"{prefix}_in_counts"]))
+        for name in cls.FIELDS:
+            setattr(ring, name, np.array(arrays[f"{prefix}_{name}"], dtype=np.int64))
+        ring.newest = int(arrays[f"{prefix}_newest"])
+        return ring
+
+
+class TrafficStats:
+    """Incremental per-minute and per-hour traffic aggregates.
+
+    Fed from the counting stage with each frame's crossing events; time is
+    the video time of the frame. Range queries never rescan the history:
+    counts and occupancy are differences of running totals, and only the
+    peak looks at the buckets inside the range.
+    """
+
+    def __init__(self, fps: float, minute_buckets: int = STATS_MINUTE_BUCKETS,
+                 hour_buckets: int = STATS_HOUR_BUCKETS):
+        # Some streams report no frame rate, fall back to a common one
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.minutes = BucketRing(60, minute_buckets)
+        self.hours = BucketRing(3600, hour_buckets)
+        self.revision = 0  # bumped on every change, consumers redraw only when it moves
+
+    def record(self, frame_index: int, events: Iterable = ()):
+        seconds = frame_index / self.fps
+        minute, hour = self.minutes.bucket(seconds), self.hours.bucket(seconds)
+        if minute > self.minutes.newest:
+            self.minutes.advance(minute)
+            self.hours.advance(hour)
+            self.revision += 1
+
+        for event in events:
+            slot = self.minutes.newest % self.minutes.size
+            minute_total = self.minutes.in_counts[slot] + self.minutes.out_counts[slot] + event.count
+            self.minutes.add(minute, event.direction, event.count, minute_total)
+            self.hours.add(hour, event.direction, event.count, minute_total)
+            self.revision += 1
+
+    @property
+    def duration(self) -> float:
+        return (self.minutes.newest + 1) * 60.0
+
+    def occupancy(self, ring: BucketRing, bucket: int) -> int:
+        slot = bucket % ring.size
+        return int(ring.cum_in[slot] - ring.cum_out[slot])
+
+    def query(self, start: float, end: float) -> TrafficSummary:
+        """Summarize traffic between two video times in seconds.
+
+        Ranges still covered by the minute ring are answered per minute,
+        older ones per hour.
+        """
+        ring = self.minutes
+        first, last = ring.bucket(start), math.ceil(end / ring.bucket_seconds) - 1
+        if first < ring.oldest:
+            ring = self.hours
+            first, last = ring.bucket(start), math.ceil(end / ring.bucket_seconds) - 1
+
+        first, last = ring.clamp(first, last)
+        if ring.newest < 0 or last < first:
+            return TrafficSummary(start, start, 0, 0, 0, 0)
+
+        in_count, out_count = ring.totals(first, last)
+        return TrafficSummary(
+            start=float(first * ring.bucket_seconds),
+            end=float((last + 1) * ring.bucket_seconds),
+            in_count=in_count,
+            out_count=out_count,
+            occupancy=self.occupancy(ring, last),
+            peak_per_minute=int(ring.peak[ring.slots(first, last)].max())
+        )
+
+    def chart_data(self, minutes: int = STATS_CHART_MINUTES) -> dict:
+        """The last minutes as plain lists, small enough to send to the GUI."""
+        ring = self.minutes
+        first = max(ring.oldest, ring.newest - minutes + 1)
+        slots = ring.slots(first, ring.newest)
+        return {
+            'start_minute': first,
+            'in': ring.in_counts[slots].tolist(),
+            'out': ring.out_counts[slots].tolist(),
+            'occupancy': (ring.cum_in[slots] - ring.cum_out[slots]).tolist(),
+        }
+
+    def save(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f, fps=np.array(self.fps), **self.minutes.to_arrays("minute"), **self.hours.to_arrays("hour")
+            )
+        os.replace(tmp_path, path)
+        logging.info(f"Saved traffic statistics to {path}")
+
+    @classmethod
+    def load(cls, path: Path) -> "TrafficStats":
+        with np.load(path) as arrays:
+            stats = cls(float(arrays["fps"]))
+            stats.minutes = BucketRing.from_arrays(arrays, "minute", 60)
+            stats.hours = BucketRing.from_arrays(arrays, "hour", 3600)
+        return stats
+
+
+def stats_path(source_path: str, stats_dir: Path = STATS_DIR) -> Path:
+    # The path hash keeps clips with the same name in different folders apart
+    digest = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()[:8]
+    return Path(stats_dir) / f"{Path(source_path).stem}-{digest}.npz"
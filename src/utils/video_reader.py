@@ -0,0 +1,252 @@
+import logging
+import queue
+import threading
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..config.settings import (DECODE_BACKEND, DECODE_QUEUE_SIZE, DECODE_THREADS,
+                               FRAME_CACHE_ENABLED, INFERENCE_SIZE)
+from .frame_cache import FrameCache
+
+# YOLO strides require input sizes that are multiples of 32
+STRIDE = 32
+PAD_VALUE = 114
+
+
+class LetterboxInfo(NamedTuple):
+    ratio: float
+    pad_x: float
+    pad_y: float
+
+
+class DecodedFrame(NamedTuple):
+    index: int
+    frame: np.ndarray  # full resolution BGR frame used for annotation
+    tensor: Optional[np.ndarray]  # letterboxed RGB float32 CHW input in [0, 1], None when not prepared
+    letterbox: Optional[LetterboxInfo]
+
+
+def make_divisible(size: int, stride: int = STRIDE) -> int:
+    return max(stride, int(np.ceil(size / stride)) * stride)
+
+
+def letterbox(frame: np.ndarray, size: int, auto: bool = True) -> Tuple[np.ndarray, LetterboxInfo]:
+    """Resize and pad a BGR frame into an inference tensor.
+
+    With ``auto`` the padding only reaches the next multiple of the stride
+    on each side (640x384 for 16:9 video), like ultralytics' rectangular
+    inference, instead of a full ``size x size`` square.
+    """
+    height, width = frame.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = size - new_width, size - new_height
+    if auto:
+        pad_x, pad_y = pad_x % STRIDE, pad_y % STRIDE
+    pad_x, pad_y = pad_x / 2, pad_y / 2
+
+    if (new_width, new_height) != (width, height):
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(
+        frame, top, bottom, left, right,
+        cv2.BORDER_CONSTANT, value=(PAD_VALUE, PAD_VALUE, PAD_VALUE)
+    )
+
+    # BGR HWC uint8 -> RGB CHW float32, the layout ultralytics expects for tensors
+    tensor = np.ascontiguousarray(padded[..., ::-1].transpose(2, 0, 1), dtype=np.float32)
+    tensor *= 1.0 / 255.0
+    return tensor, LetterboxInfo(ratio, left, top)
+
+
+def unletterbox_boxes(xyxy: np.ndarray, info: LetterboxInfo, frame_shape: tuple) -> np.ndarray:
+    """Map boxes predicted on a letterboxed tensor back to frame coordinates."""
+    boxes = xyxy.astype(np.float32, copy=True)
+    boxes[:, [0, 2]] -= info.pad_x
+    boxes[:, [1, 3]] -= info.pad_y
+    boxes /= info.ratio
+    height, width = frame_shape[:2]
+    np.clip(boxes[:, [0, 2]], 0, width, out=boxes[:, [0, 2]])
+    np.clip(boxes[:, [1, 3]], 0, height, out=boxes[:, [1, 3]])
+    return boxes
+
+
+class FrameReader:
+    """Decodes frames on a background thread and prepares inference tensors.
+
+    Iterating yields DecodedFrame items, so the consumer only has to run
+    inference, tracking and annotation. With ``imgsz=None`` no tensors are
+    prepared (tiled and ROI detection work on the frame itself), and with
+    ``frame_skip`` only the frames that will be detected on get one.
+    """
+
+    def __init__(self, source_path: str, imgsz: Optional[int] = INFERENCE_SIZE,
+                 queue_size: int = DECODE_QUEUE_SIZE, frame_skip: int = 0):
+        self.source_path = source_path
+        self.imgsz = make_divisible(imgsz) if imgsz is not None else None
+        self.frame_skip = frame_skip
+        self.queue_size = queue_size
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.total_frames = 0
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._open()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _frames(self) -> Iterator[np.ndarray]:
+        raise NotImplementedError
+
+    def _release(self):
+        pass
+
+    def _put(self, frames: queue.Queue, item) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_loop(self, frames: queue.Queue):
+        try:
+            for index, frame in enumerate(self._frames()):
+                tensor, info = None, None
+                if self.imgsz is not None and index % (self.frame_skip + 1) == 0:
+                    tensor, info = letterbox(frame, self.imgsz)
+                if not self._put(frames, DecodedFrame(index, frame, tensor, info)):
+                    break
+        except Exception as e:
+            logging.error(f"Error decoding {self.source_path}: {str(e)}")
+            self._put(frames, e)
+        finally:
+            self._put(frames, None)
+
+    def __iter__(self) -> Iterator[DecodedFrame]:
+        frames = queue.Queue(maxsize=self.queue_size)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._decode_loop, args=(frames,), daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = frames.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._stop_event.set()
+            self._thread.join()
+
+    def close(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class OpenCVFrameReader(FrameReader):
+    def _open(self):
+        self.cap = cv2.VideoCapture(self.source_path)
+        if not self.cap.isOpened():
+            raise ValueError(f"Could not open video source: {self.source_path}")
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def _frames(self) -> Iterator[np.ndarray]:
+        while self.cap.isOpened():
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            yield frame
+
+    def _release(self):
+        self.cap.release()
+
+
+class PyAVFrameReader(FrameReader):
+    """Frame reader backed by PyAV with codec-level multi-threaded decoding."""
+
+    def _open(self):
+        try:
+            import av
+        except ImportError as e:
+            raise ImportError("The 'pyav' decode backend requires PyAV: pip install av") from e
+
+        try:
+            self.container = av.open(self.source_path)
+        except Exception as e:
+            raise ValueError(f"Could not open video source: {self.source_path}") from e
+        self.stream = self.container.streams.video[0]
+        # Frame and slice threading inside the decoder
+        self.stream.thread_type = "AUTO"
+        if DECODE_THREADS:
+            self.stream.thread_count = DECODE_THREADS
+
+        self.width = self.stream.codec_context.width
+        self.height = self.stream.codec_context.height
+        self.fps = float(self.stream.average_rate or 0)
+        self.total_frames = int(self.stream.frames or 0)
+
+    def _frames(self) -> Iterator[np.ndarray]:
+        for frame in self.container.decode(self.stream):
+            yield frame.to_ndarray(format="bgr24")
+
+    def _release(self):
+        self.container.close()
+
+
+class CachedFrameReader(FrameReader):
+    """Serves frames from the decode-once frame cache.
+
+    Frames are read-only views into the memory-mapped cache file, nothing
+    is decoded or copied on repeated runs of the same clip.
+    """
+
+    def _open(self):
+        self.clip = FrameCache().open(self.source_path)
+        self.width = self.clip.width
+        self.height = self.clip.height
+        self.fps = self.clip.fps
+        self.total_frames = len(self.clip.frames)
+
+    def _frames(self) -> Iterator[np.ndarray]:
+        for index in range(self.total_frames):
+            yield self.clip.frames[index]
+
+
+FRAME_READERS = {
+    "opencv": OpenCVFrameReader,
+    "pyav": PyAVFrameReader,
+}
+
+
+def create_frame_reader(source_path: str, backend: Optional[str] = None,
+                        imgsz: Optional[int] = INFERENCE_SIZE, use_cache: Optional[bool] = None,
+                        frame_skip: int = 0) -> FrameReader:
+    if use_cache is None:
+        # Clips over the cache limit are decoded normally
+        use_cache = FRAME_CACHE_ENABLED and FrameCache().fits(source_path)
+    if use_cache:
+        return CachedFrameReader(source_path, imgsz=imgsz, frame_skip=frame_skip)
+    backend = backend or DECODE_BACKEND
+    if backend not in FRAME_READERS:
+        raise ValueError(f"Unknown decode backend: {backend}")
+    return FRAME_READERS[backend](source_path, imgsz=imgsz, frame_skip=frame_skip)
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
-from supervision.tools.detections import Detections
+import supervision as sv
+
 
 class Visualizer:
     @staticmethod
@@ -15,4 +16,189 @@ class Visualizer:
             (0, 255, 0),
             2
         )
-        return frame 
\ No newline at end of file
+        return frame
+
+    @staticmethod
+    def draw_detections(frame: np.ndarray, detections: sv.Detections) -> np.ndarray:
+        # Draw boxes and labels (all as cars)
+        for xyxy, confidence in zip(detections.xyxy, detections.confidence):
+            x1, y1, x2, y2 = map(int, xyxy)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+            label = f"Car {confidence:.2f}"
+            cv2.putText(
+                frame,
+                label,
+                (x1, y1-10),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.5,
+                (0, 255, 0),
+                2
+            )
+        return frame
+
+    @staticmethod
+    def draw_counting_line(frame: np.ndarray, line_start: sv.Point, line_end: sv.Point) -> np.ndarray:
+        # Draw line counter with improved visibility
+        line_color = (0, 255, 255)  # Yellow
+        cv2.line(
+            frame,
+            (int(line_start.x), int(line_start.y)),
+            (int(line_end.x), int(line_start.y)),
+            line_color,
+            4  # Thicker line
+        )
+
+        # Add direction indicators with better visibility
+        mid_x = (line_start.x + line_end.x) // 2
+
+        # Draw direction arrows
+        arrow_color = (0, 255, 255)  # Yellow
+
+        # IN arrow
+        cv2.arrowedLine(
+            frame,
+            (int(mid_x - 150), int(line_start.y - 40)),
+            (int(mid_x - 50), int(line_start.y - 40)),
+            arrow_color,
+            3,
+            tipLength=0.3
+        )
+
+        # OUT arrow
+        cv2.arrowedLine(
+            frame,
+            (int(mid_x + 150), int(line_start.y - 40)),
+            (int(mid_x + 50), int(line_start.y - 40)),
+            arrow_color,
+            3,
+            tipLength=0.3
+        )
+
+        # Add text with background for better visibility
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        font_scale = 1
+        thickness = 2
+
+        # IN text
+        in_text = "IN"
+        (text_width, text_height), _ = cv2.getTextSize(in_text, font, font_scale, thickness)
+        cv2.rectangle(
+            frame,
+            (int(mid_x - 150 - 10), int(line_start.y - 40 - text_height - 10)),
+            (int(mid_x - 150 + text_width + 10), int(line_start.y - 40 + 10)),
+            (0, 0, 0),
+            -1
+        )
+        cv2.putText(
+            frame,
+            in_text,
+            (int(mid_x - 150), int(line_start.y - 40)),
+            font,
+            font_scale,
+            arrow_color,
+            thickness
+        )
+
+        # OUT text
+        out_text = "OUT"
+        (text_width, text_height), _ = cv2.getTextSize(out_text, font, font_scale, thickness)
+        cv2.rectangle(
+            frame,
+            (int(mid_x + 150 - text_width - 10), int(line_start.y - 40 - text_height - 10)),
+            (int(mid_x + 150 + 10), int(line_start.y - 40 + 10)),
+            (0, 0, 0),
+            -1
+        )
+        cv2.putText(
+            frame,
+            out_text,
+            (int(mid_x + 150 - text_width), int(line_start.y - 40)),
+            font,
+            font_scale,
+            arrow_color,
+            thickness
+        )
+        return frame
+
+    @staticmethod
+    def draw_count_overlay(frame: np.ndarray, in_count: int, out_count: int) -> np.ndarray:
+        # Add count overlay with improved design
+        # Create background for counts
+        overlay_height = 130
+        overlay_width = 250
+        cv2.rectangle(
+            frame,
+            (10, 10),
+            (10 + overlay_width, 10 + overlay_height),
+            (0, 0, 0),
+            -1
+        )
+        cv2.rectangle(
+            frame,
+            (10, 10),
+            (10 + overlay_width, 10 + overlay_height),
+            (0, 255, 255),  # Yellow border
+            2
+        )
+
+        # Add counts with improved styling
+        # IN count
+        cv2.putText(
+            frame,
+            "Cars IN:",
+            (20, 40),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.8,
+            (0, 255, 255),  # Yellow text
+            2
+        )
+        cv2.putText(
+            frame,
+            str(in_count),
+            (160, 40),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            (0, 255, 0),  # Green number
+            2
+        )
+
+        # OUT count
+        cv2.putText(
+            frame,
+            "Cars OUT:",
+            (20, 80),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.8,
+            (0, 255, 255),  # Yellow text
+            2
+        )
+        cv2.putText(
+            frame,
+            str(out_count),
+            (160, 80),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            (0, 255, 0),  # Green number
+            2
+        )
+
+        # Total count
+        cv2.putText(
+            frame,
+            "TOTAL:",
+            (20, 120),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.8,
+            (0, 255, 255),  # Yellow text
+            2
+        )
+        cv2.putText(
+            frame,
+            str(in_count + out_count),
+            (160, 120),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            (0, 255, 0),  # Green number
+            2
+        )
+        return frame